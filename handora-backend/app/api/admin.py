@@ -14,23 +14,47 @@ ADMIN API - Yalnız admin istifadəçilər üçün
 Create, Update, Delete əməliyyatları
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, status
+from sqlalchemy import Integer, String, column, select, func, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Optional
-from app.database import get_db
+from datetime import datetime
+from app.database import get_async_db
 from app.models.product import Product, Category, Brand
-from app.models.order import Order
+from app.models.order import Order, ORDER_STATUSES, ORDER_TRANSITIONS, can_transition
 from app.schemas.product import (
     ProductResponse, ProductDetail, 
     ParentCategoryCreate, ParentCategoryUpdate, ParentCategoryResponse,
     SubCategoryCreate, SubCategoryUpdate, SubCategoryResponse,
     BrandCreate, BrandUpdate, BrandResponse
 )
+from app.schemas.inventory import ProductShardsResponse
+from app.schemas.order import (
+    AdminOrderResponse, BulkOrderStatusUpdate, BulkOrderStatusResponse, OrderStatusResult
+)
+from app.schemas.pagination import CursorPage
 from app.core.security import get_current_admin
-from app.core.utils import save_product_image, delete_file
+from app.core.pagination import (
+    paginate, PRODUCT_SORTS, PRODUCT_SORT_PATTERN, ORDER_SORTS, ORDER_SORT_PATTERN, CATEGORY_SORT, BRAND_SORT
+)
+from app.core.utils import save_product_images, delete_file
+from app.core.image_store import release_images
+from app.core.category_tree import add_category_node, move_category_node, is_descendant
+from app.core.response_cache import bump_versions, to_json
+from app.core.idempotency import IDEMPOTENCY_HEADER, fingerprint, run_idempotent
+from app.core.inventory import set_product_shards, MAX_SHARDS
+from app.core.stats import read_counters, recompute
 
 router = APIRouter(prefix="/admin", tags=["Admin Panel"])
 
+ORDER_STATUS_PATTERN = f"^({'|'.join(ORDER_STATUSES)})$"
+
+
+def _transition_error(current: str, new: str) -> str:
+    allowed = ", ".join(sorted(ORDER_TRANSITIONS.get(current, set()))) or "yoxdur"
+    return f"'{current}' statusundan '{new}' statusuna keçid olmaz (mümkün: {allowed})"
+
 # ============================================
 # PRODUCT MANAGEMENT
 # ============================================
@@ -63,9 +87,12 @@ async def admin_create_product(
     # Images
     images: List[UploadFile] = File(..., description="Məhsul şəkilləri (minimum 1)"),
     
+    # Təkrar göndərmədə ikinci məhsul yaradılmasın
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+    
     # Dependencies
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Yeni məhsul əlavə et
@@ -77,12 +104,12 @@ async def admin_create_product(
     """
     
     # Validate category exists
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = await db.scalar(select(Category).where(Category.id == category_id))
     if not category:
         raise HTTPException(status_code=404, detail=f"Kateqoriya ID {category_id} tapılmadı")
     
     # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.scalar(select(Brand).where(Brand.id == brand_id))
     if not brand:
         raise HTTPException(status_code=404, detail=f"Brend ID {brand_id} tapılmadı")
     
@@ -100,23 +127,11 @@ async def admin_create_product(
     if len(images) > 10:
         raise HTTPException(status_code=400, detail="Maksimum 10 şəkil yükləyə bilərsiniz")
     
-    # Upload images
-    image_urls = []
-    uploaded_files = []
-    
-    try:
-        for image in images:
-            image_url = await save_product_image(image)
-            image_urls.append(image_url)
-            uploaded_files.append(image_url)
-    except Exception as e:
-        # Rollback: delete uploaded images
-        for url in uploaded_files:
-            delete_file(url)
-        raise e
-    
-    # Create product
-    try:
+    async def handler():
+        # Upload images (təkrar göndərmədə bura çatılmır)
+        image_variants = await save_product_images(db, images)
+        image_urls = [image["url"] for image in image_variants]
+        
         new_product = Product(
             name_az=name_az,
             name_en=name_en,
@@ -131,20 +146,32 @@ async def admin_create_product(
             stock=stock,
             is_new=is_new,
             is_sale=is_sale or (discount_price is not None),  # Auto-set is_sale if discount exists
-            image_urls=image_urls
+            image_urls=image_urls,
+            image_variants=image_variants
         )
         
         db.add(new_product)
-        db.commit()
-        db.refresh(new_product)
-        
-        return new_product
-        
+        await db.flush()
+        await bump_versions(db, "products", f"product:{new_product.id}")
+        await db.refresh(new_product, ["brand"])
+        return to_json(ProductResponse, new_product)
+    
+    request_fingerprint = fingerprint(
+        name_az, name_en, name_ru, description_az, description_en, description_ru,
+        price, discount_price, category_id, brand_id, stock, is_new, is_sale,
+        *[(image.filename, image.size) for image in images]
+    )
+    
+    try:
+        return await run_idempotent(
+            db, idempotency_key, f"{current_admin.id}:POST /admin/products",
+            request_fingerprint, handler, status_code=status.HTTP_201_CREATED
+        )
     except Exception as e:
-        # Rollback: delete uploaded images
-        for url in image_urls:
-            delete_file(url)
-        db.rollback()
+        # Rollback: bu sorğuda yeni yazılmış şəkil faylları da silinir (app/core/image_store.py)
+        await db.rollback()
+        if isinstance(e, HTTPException):
+            raise e
         raise HTTPException(status_code=500, detail=f"Məhsul yaradılmadı: {str(e)}")
 
 
@@ -180,7 +207,7 @@ async def admin_update_product(
     
     # Dependencies
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Məhsulu redaktə et
@@ -189,7 +216,7 @@ async def admin_update_product(
     """
     
     # Find product
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.scalar(select(Product).where(Product.id == product_id))
     if not product:
         raise HTTPException(status_code=404, detail="Məhsul tapılmadı")
     
@@ -218,20 +245,23 @@ async def admin_update_product(
     
     # Update categorization
     if category_id:
-        category = db.query(Category).filter(Category.id == category_id).first()
+        category = await db.scalar(select(Category).where(Category.id == category_id))
         if not category:
             raise HTTPException(status_code=404, detail="Kateqoriya tapılmadı")
         product.category_id = category_id
     
     if brand_id:
-        brand = db.query(Brand).filter(Brand.id == brand_id).first()
+        brand = await db.scalar(select(Brand).where(Brand.id == brand_id))
         if not brand:
             raise HTTPException(status_code=404, detail="Brend tapılmadı")
         product.brand_id = brand_id
     
-    # Update inventory
+    # Update inventory (sharded məhsulda yeni stok shard-lara bölünür)
     if stock is not None:
-        product.stock = stock
+        if product.stock_shards:
+            await set_product_shards(db, product_id, product.stock_shards, total=stock)
+        else:
+            product.stock = stock
     
     # Update flags
     if is_new is not None:
@@ -239,49 +269,46 @@ async def admin_update_product(
     if is_sale is not None:
         product.is_sale = is_sale
     
+    await bump_versions(db, "products", f"product:{product_id}")
+    
     # Update images if provided
     if images and len(images) > 0:
         if len(images) > 10:
             raise HTTPException(status_code=400, detail="Maksimum 10 şəkil yükləyə bilərsiniz")
         
         old_images = product.image_urls or []
-        new_image_urls = []
-        uploaded_files = []
         
         try:
             # Upload new images
-            for image in images:
-                image_url = await save_product_image(image)
-                new_image_urls.append(image_url)
-                uploaded_files.append(image_url)
+            image_variants = await save_product_images(db, images)
             
             # Update product
-            product.image_urls = new_image_urls
-            db.commit()
+            product.image_urls = [image["url"] for image in image_variants]
+            product.image_variants = image_variants
             
-            # Delete old images after successful update
-            for old_url in old_images:
-                delete_file(old_url)
+            # Köhnə şəkillərin istinadı buraxılır - başqa yerdə istifadə olunmayanlar commit-dən sonra silinir
+            await release_images(db, old_images)
+            await db.commit()
                 
         except Exception as e:
-            # Rollback: delete newly uploaded images
-            for url in uploaded_files:
-                delete_file(url)
-            db.rollback()
+            # Rollback: yeni yazılmış şəkil faylları da silinir
+            await db.rollback()
+            if isinstance(e, HTTPException):
+                raise e
             raise HTTPException(status_code=500, detail=f"Şəkillər yenilənmədi: {str(e)}")
     else:
         # No images update, just commit other changes
-        db.commit()
+        await db.commit()
     
-    db.refresh(product)
+    await db.refresh(product, ["brand"])
     return product
 
 
 @router.delete("/products/{product_id}", status_code=status.HTTP_200_OK)
-def admin_delete_product(
+async def admin_delete_product(
     product_id: int,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Məhsulu sil
@@ -289,18 +316,18 @@ def admin_delete_product(
     Şəkillər də silinəcək
     """
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.scalar(select(Product).where(Product.id == product_id))
     if not product:
         raise HTTPException(status_code=404, detail="Məhsul tapılmadı")
     
-    # Delete all images
+    # Delete all images (başqa məhsulda istifadə olunmayanlar commit-dən sonra)
     if product.image_urls:
-        for image_url in product.image_urls:
-            delete_file(image_url)
+        await release_images(db, product.image_urls)
     
     # Delete product
-    db.delete(product)
-    db.commit()
+    await bump_versions(db, "products", f"product:{product_id}")
+    await db.delete(product)
+    await db.commit()
     
     return {
         "message": "Məhsul uğurla silindi",
@@ -309,15 +336,35 @@ def admin_delete_product(
     }
 
 
-@router.get("/products", response_model=List[ProductResponse])
-def admin_get_all_products(
-    skip: int = 0,
-    limit: int = 50,
+@router.put("/products/{product_id}/inventory-shards", response_model=ProductShardsResponse)
+async def admin_set_product_shards(
+    product_id: int,
+    shards: int = Query(..., ge=0, le=MAX_SHARDS, description="0 - shard-lar products.stock-a birləşdirilir"),
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    ADMIN - Flash sale məhsulunun stokunu N sayğaca böl.
+    Paralel checkout-lar fərqli sətirləri kilidləyir, buna görə bir məhsul üzrə
+    sifariş sürəti shard sayı ilə artır. Satış bitəndə shards=0 ilə geri birləşdirin.
+    """
+    product = await set_product_shards(db, product_id, shards)
+    await db.commit()
+    return {"product_id": product.id, "stock": product.stock, "stock_shards": product.stock_shards}
+
+
+@router.get("/products", response_model=CursorPage[ProductResponse])
+async def admin_get_all_products(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    sort: str = Query("newest", pattern=PRODUCT_SORT_PATTERN),
+    current_admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ADMIN - Bütün məhsulları gör"""
-    return db.query(Product).offset(skip).limit(limit).all()
+    stmt = select(Product).options(joinedload(Product.brand))
+    items, next_cursor = await paginate(db, stmt, PRODUCT_SORTS[sort], cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
 
 
 # ============================================
@@ -330,16 +377,16 @@ def admin_get_all_products(
     status_code=status.HTTP_201_CREATED,
     summary="[ADMIN] Yeni əsas kateqoriya yarat"
 )
-def admin_create_parent_category(
+async def admin_create_parent_category(
     category: ParentCategoryCreate,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Yeni əsas kateqoriya yaradır (parent_id = NULL).
     """
     # Check if slug already exists
-    existing = db.query(Category).filter(Category.slug == category.slug).first()
+    existing = await db.scalar(select(Category).where(Category.slug == category.slug))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -355,31 +402,31 @@ def admin_create_parent_category(
     )
     
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await db.flush()
+    await add_category_node(db, db_category.id, None)
+    await bump_versions(db, "categories")
+    await db.commit()
+    await db.refresh(db_category)
     
     return db_category
 
 
 @router.get(
     "/categories",
-    response_model=List[ParentCategoryResponse],
+    response_model=CursorPage[ParentCategoryResponse],
     summary="[ADMIN] Bütün əsas kateqoriyaları gətir"
 )
-def admin_get_parent_categories(
-    skip: int = 0,
-    limit: int = 100,
+async def admin_get_parent_categories(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ADMIN - Bütün əsas kateqoriyaları qaytarır"""
-    categories = db.query(Category)\
-        .filter(Category.parent_id == None)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    stmt = select(Category).where(Category.parent_id == None)
+    items, next_cursor = await paginate(db, stmt, CATEGORY_SORT, cursor, limit)
     
-    return categories
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.put(
@@ -387,18 +434,18 @@ def admin_get_parent_categories(
     response_model=ParentCategoryResponse,
     summary="[ADMIN] Əsas kateqoriyanı yenilə"
 )
-def admin_update_parent_category(
+async def admin_update_parent_category(
     category_id: int,
     category_update: ParentCategoryUpdate,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Mövcud əsas kateqoriyanı yeniləyir.
     """
-    db_category = db.query(Category)\
-        .filter(Category.id == category_id, Category.parent_id == None)\
-        .first()
+    db_category = await db.scalar(
+        select(Category).where(Category.id == category_id, Category.parent_id == None)
+    )
     
     if not db_category:
         raise HTTPException(
@@ -411,9 +458,9 @@ def admin_update_parent_category(
     
     # Check slug uniqueness if being updated
     if "slug" in update_data:
-        existing = db.query(Category)\
-            .filter(Category.slug == update_data["slug"], Category.id != category_id)\
-            .first()
+        existing = await db.scalar(
+            select(Category).where(Category.slug == update_data["slug"], Category.id != category_id)
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -423,8 +470,9 @@ def admin_update_parent_category(
     for field, value in update_data.items():
         setattr(db_category, field, value)
     
-    db.commit()
-    db.refresh(db_category)
+    await bump_versions(db, "categories")
+    await db.commit()
+    await db.refresh(db_category)
     
     return db_category
 
@@ -434,18 +482,18 @@ def admin_update_parent_category(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="[ADMIN] Əsas kateqoriyanı sil"
 )
-def admin_delete_parent_category(
+async def admin_delete_parent_category(
     category_id: int,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Əsas kateqoriyanı silir.
     Əgər alt kateqoriyalar varsa, xəta qaytarır.
     """
-    db_category = db.query(Category)\
-        .filter(Category.id == category_id, Category.parent_id == None)\
-        .first()
+    db_category = await db.scalar(
+        select(Category).where(Category.id == category_id, Category.parent_id == None)
+    )
     
     if not db_category:
         raise HTTPException(
@@ -454,9 +502,9 @@ def admin_delete_parent_category(
         )
     
     # Check if has subcategories
-    subcategories_count = db.query(Category)\
-        .filter(Category.parent_id == category_id)\
-        .count()
+    subcategories_count = await db.scalar(
+        select(func.count()).select_from(Category).where(Category.parent_id == category_id)
+    )
     
     if subcategories_count > 0:
         raise HTTPException(
@@ -464,8 +512,9 @@ def admin_delete_parent_category(
             detail=f"Bu kateqoriyanın {subcategories_count} alt kateqoriyası var. Əvvəlcə onları silin."
         )
     
-    db.delete(db_category)
-    db.commit()
+    await db.delete(db_category)
+    await bump_versions(db, "categories")
+    await db.commit()
     
     return None
 
@@ -480,28 +529,28 @@ def admin_delete_parent_category(
     status_code=status.HTTP_201_CREATED,
     summary="[ADMIN] Yeni alt kateqoriya yarat"
 )
-def admin_create_subcategory(
+async def admin_create_subcategory(
     subcategory: SubCategoryCreate,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Yeni alt kateqoriya yaradır.
-    parent_id məcburidir və mövcud əsas kateqoriya olmalıdır.
+    parent_id məcburidir və mövcud kateqoriya olmalıdır (istənilən dərinlikdə).
     """
-    # Verify parent category exists and is a parent (not a subcategory)
-    parent = db.query(Category)\
-        .filter(Category.id == subcategory.parent_id, Category.parent_id == None)\
-        .first()
+    # Verify parent category exists
+    parent = await db.scalar(
+        select(Category).where(Category.id == subcategory.parent_id)
+    )
     
     if not parent:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"ID {subcategory.parent_id} ilə əsas kateqoriya tapılmadı"
+            detail=f"ID {subcategory.parent_id} ilə kateqoriya tapılmadı"
         )
     
     # Check if slug already exists
-    existing = db.query(Category).filter(Category.slug == subcategory.slug).first()
+    existing = await db.scalar(select(Category).where(Category.slug == subcategory.slug))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -517,31 +566,35 @@ def admin_create_subcategory(
     )
     
     db.add(db_subcategory)
-    db.commit()
-    db.refresh(db_subcategory)
+    await db.flush()
+    await add_category_node(db, db_subcategory.id, db_subcategory.parent_id)
+    await bump_versions(db, "categories")
+    await db.commit()
+    await db.refresh(db_subcategory)
     
     return db_subcategory
 
 
 @router.get(
     "/subcategories",
-    response_model=List[SubCategoryResponse],
+    response_model=CursorPage[SubCategoryResponse],
     summary="[ADMIN] Bütün alt kateqoriyaları gətir"
 )
-def admin_get_subcategories(
+async def admin_get_subcategories(
     parent_id: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ADMIN - Bütün alt kateqoriyaları qaytarır"""
-    query = db.query(Category).filter(Category.parent_id != None)
+    stmt = select(Category).where(Category.parent_id != None)
     
     if parent_id:
-        query = query.filter(Category.parent_id == parent_id)
+        stmt = stmt.where(Category.parent_id == parent_id)
     
-    return query.offset(skip).limit(limit).all()
+    items, next_cursor = await paginate(db, stmt, CATEGORY_SORT, cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.put(
@@ -549,18 +602,18 @@ def admin_get_subcategories(
     response_model=SubCategoryResponse,
     summary="[ADMIN] Alt kateqoriyanı yenilə"
 )
-def admin_update_subcategory(
+async def admin_update_subcategory(
     subcategory_id: int,
     subcategory_update: SubCategoryUpdate,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Mövcud alt kateqoriyanı yeniləyir.
     """
-    db_subcategory = db.query(Category)\
-        .filter(Category.id == subcategory_id, Category.parent_id != None)\
-        .first()
+    db_subcategory = await db.scalar(
+        select(Category).where(Category.id == subcategory_id, Category.parent_id != None)
+    )
     
     if not db_subcategory:
         raise HTTPException(
@@ -571,21 +624,28 @@ def admin_update_subcategory(
     update_data = subcategory_update.model_dump(exclude_unset=True)
     
     # Verify new parent_id if being updated
+    parent_changed = "parent_id" in update_data and update_data["parent_id"] != db_subcategory.parent_id
     if "parent_id" in update_data:
-        parent = db.query(Category)\
-            .filter(Category.id == update_data["parent_id"], Category.parent_id == None)\
-            .first()
+        parent = await db.scalar(
+            select(Category).where(Category.id == update_data["parent_id"])
+        )
         if not parent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"ID {update_data['parent_id']} ilə əsas kateqoriya tapılmadı"
+                detail=f"ID {update_data['parent_id']} ilə kateqoriya tapılmadı"
+            )
+        # Kateqoriya öz alt ağacına köçürülə bilməz
+        if parent_changed and await is_descendant(db, parent.id, subcategory_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Kateqoriya öz alt kateqoriyasının altına köçürülə bilməz"
             )
     
     # Check slug uniqueness if being updated
     if "slug" in update_data:
-        existing = db.query(Category)\
-            .filter(Category.slug == update_data["slug"], Category.id != subcategory_id)\
-            .first()
+        existing = await db.scalar(
+            select(Category).where(Category.slug == update_data["slug"], Category.id != subcategory_id)
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -595,8 +655,12 @@ def admin_update_subcategory(
     for field, value in update_data.items():
         setattr(db_subcategory, field, value)
     
-    db.commit()
-    db.refresh(db_subcategory)
+    if parent_changed:
+        await move_category_node(db, subcategory_id, update_data["parent_id"])
+    
+    await bump_versions(db, "categories")
+    await db.commit()
+    await db.refresh(db_subcategory)
     
     return db_subcategory
 
@@ -606,17 +670,17 @@ def admin_update_subcategory(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="[ADMIN] Alt kateqoriyanı sil"
 )
-def admin_delete_subcategory(
+async def admin_delete_subcategory(
     subcategory_id: int,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ADMIN - Alt kateqoriyanı silir.
     """
-    db_subcategory = db.query(Category)\
-        .filter(Category.id == subcategory_id, Category.parent_id != None)\
-        .first()
+    db_subcategory = await db.scalar(
+        select(Category).where(Category.id == subcategory_id, Category.parent_id != None)
+    )
     
     if not db_subcategory:
         raise HTTPException(
@@ -624,8 +688,21 @@ def admin_delete_subcategory(
             detail=f"ID {subcategory_id} ilə alt kateqoriya tapılmadı"
         )
     
-    db.delete(db_subcategory)
-    db.commit()
+    # Check if has nested subcategories
+    children_count = await db.scalar(
+        select(func.count()).select_from(Category).where(Category.parent_id == subcategory_id)
+    )
+    
+    if children_count > 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bu kateqoriyanın {children_count} alt kateqoriyası var. Əvvəlcə onları silin."
+        )
+    
+    # Closure sətirləri FK ON DELETE CASCADE ilə silinir
+    await db.delete(db_subcategory)
+    await bump_versions(db, "categories")
+    await db.commit()
     
     return None
 
@@ -635,15 +712,15 @@ def admin_delete_subcategory(
 # ============================================
 
 @router.post("/brands", response_model=BrandResponse, status_code=status.HTTP_201_CREATED)
-def admin_create_brand(
+async def admin_create_brand(
     brand_data: BrandCreate,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ADMIN - Yeni brend əlavə et"""
     
     # Check if brand exists
-    existing = db.query(Brand).filter(Brand.name == brand_data.name).first()
+    existing = await db.scalar(select(Brand).where(Brand.name == brand_data.name))
     if existing:
         raise HTTPException(status_code=400, detail="Bu brend artıq mövcuddur")
     
@@ -654,43 +731,46 @@ def admin_create_brand(
     )
     
     db.add(new_brand)
-    db.commit()
-    db.refresh(new_brand)
+    await bump_versions(db, "brands")
+    await db.commit()
+    await db.refresh(new_brand)
     
     return new_brand
 
 
-@router.get("/brands", response_model=List[BrandResponse])
-def admin_get_brands(
-    skip: int = 0,
-    limit: int = 100,
+@router.get("/brands", response_model=CursorPage[BrandResponse])
+async def admin_get_brands(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """ADMIN - Bütün brendləri gətir"""
-    return db.query(Brand).offset(skip).limit(limit).all()
+    """ADMIN - Bütün brendləri gətir (yeni brendlər əvvəl)"""
+    items, next_cursor = await paginate(db, select(Brand), BRAND_SORT, cursor, limit)
+    
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.put("/brands/{brand_id}", response_model=BrandResponse)
-def admin_update_brand(
+async def admin_update_brand(
     brand_id: int,
     brand_data: BrandUpdate,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ADMIN - Brendi redaktə et"""
     
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.scalar(select(Brand).where(Brand.id == brand_id))
     if not brand:
         raise HTTPException(status_code=404, detail="Brend tapılmadı")
     
     # Update name
     if brand_data.name:
         # Check if new name already exists
-        existing = db.query(Brand).filter(
+        existing = await db.scalar(select(Brand).where(
             Brand.name == brand_data.name,
             Brand.id != brand_id
-        ).first()
+        ))
         if existing:
             raise HTTPException(status_code=400, detail="Bu brend adı artıq istifadə olunur")
         brand.name = brand_data.name
@@ -703,26 +783,27 @@ def admin_update_brand(
     if brand_data.logo_url is not None:
         brand.logo_url = brand_data.logo_url
     
-    db.commit()
-    db.refresh(brand)
+    await bump_versions(db, "brands")
+    await db.commit()
+    await db.refresh(brand)
     
     return brand
 
 
 @router.delete("/brands/{brand_id}")
-def admin_delete_brand(
+async def admin_delete_brand(
     brand_id: int,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ADMIN - Brendi sil"""
     
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.scalar(select(Brand).where(Brand.id == brand_id))
     if not brand:
         raise HTTPException(status_code=404, detail="Brend tapılmadı")
     
     # Check if brand has products
-    products_count = db.query(Product).filter(Product.brand_id == brand_id).count()
+    products_count = await db.scalar(select(func.count()).select_from(Product).where(Product.brand_id == brand_id))
     if products_count > 0:
         raise HTTPException(
             status_code=400,
@@ -731,10 +812,11 @@ def admin_delete_brand(
     
     # Delete logo
     if brand.logo_url:
-        delete_file(brand.logo_url)
+        await delete_file(brand.logo_url)
     
-    db.delete(brand)
-    db.commit()
+    await bump_versions(db, "brands")
+    await db.delete(brand)
+    await db.commit()
     
     return {"message": "Brend silindi", "brand_id": brand_id}
 
@@ -743,51 +825,76 @@ def admin_delete_brand(
 # ORDER MANAGEMENT (ADMIN)
 # ============================================
 
-@router.get("/orders")
-def admin_get_all_orders(
-    skip: int = 0,
-    limit: int = 50,
-    status: Optional[str] = None,
+@router.get("/orders", response_model=CursorPage[AdminOrderResponse])
+async def admin_get_all_orders(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    sort: str = Query("newest", pattern=ORDER_SORT_PATTERN),
+    status: Optional[str] = Query(None, pattern=ORDER_STATUS_PATTERN),
+    user_id: Optional[int] = None,
+    user_email: Optional[str] = None,
+    tracking_number: Optional[str] = None,
+    date_from: Optional[datetime] = Query(None, description="Bu tarixdən (daxil)"),
+    date_to: Optional[datetime] = Query(None, description="Bu tarixədək (daxil deyil)"),
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """ADMIN - Bütün sifarişləri gör"""
+    """
+    ADMIN - Bütün sifarişləri gör
     
-    query = db.query(Order)
+    Hər filtr indekslə dəstəklənir: status -> (status, created_at, id),
+    istifadəçi -> (user_id, created_at, id), tracking -> partial indeks,
+    tarix -> (created_at, id). Sətirlər və müştəri eager yüklənir (səhifə başına 2 sorğu).
+    """
+    from app.models.user import User
+    
+    stmt = select(Order).options(selectinload(Order.items), joinedload(Order.user))
     
     if status:
-        query = query.filter(Order.status == status)
+        stmt = stmt.where(Order.status == status)
+    if user_id:
+        stmt = stmt.where(Order.user_id == user_id)
+    if user_email:
+        stmt = stmt.where(Order.user_id == select(User.id).where(User.email == user_email).scalar_subquery())
+    if tracking_number:
+        stmt = stmt.where(Order.tracking_number == tracking_number)
+    if date_from:
+        stmt = stmt.where(Order.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(Order.created_at < date_to)
     
-    orders = query.offset(skip).limit(limit).all()
-    return orders
+    orders, next_cursor = await paginate(db, stmt, ORDER_SORTS[sort], cursor, limit)
+    return {"items": orders, "next_cursor": next_cursor}
 
 
 @router.put("/orders/{order_id}/status")
-def admin_update_order_status(
+async def admin_update_order_status(
     order_id: int,
     status: str,
     tracking_number: Optional[str] = None,
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ADMIN - Sifariş statusunu yenilə"""
     
-    valid_statuses = ["pending", "confirmed", "shipped", "delivered", "cancelled"]
+    valid_statuses = ORDER_STATUSES
     if status not in valid_statuses:
         raise HTTPException(
             status_code=400,
             detail=f"Status yalnız bunlardan biri ola bilər: {', '.join(valid_statuses)}"
         )
     
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id).with_for_update())
     if not order:
         raise HTTPException(status_code=404, detail="Sifariş tapılmadı")
+    if not can_transition(order.status, status):
+        raise HTTPException(status_code=409, detail=_transition_error(order.status, status))
     
     order.status = status
     if tracking_number:
         order.tracking_number = tracking_number
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": f"Sifariş statusu '{status}' olaraq yeniləndi",
@@ -797,47 +904,107 @@ def admin_update_order_status(
     }
 
 
+@router.post("/orders/status/bulk", response_model=BulkOrderStatusResponse)
+async def admin_bulk_update_order_status(
+    data: BulkOrderStatusUpdate,
+    current_admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    ADMIN - Çoxlu sifarişin statusunu bir sorğu ilə yenilə
+    
+    Sifarişlər id sırası ilə bir SELECT ... FOR UPDATE ilə kilidlənir, keçidlər
+    yoxlanılır və keçərli olanlar bir UPDATE ... FROM VALUES ilə yazılır.
+    Hər sifariş üçün ayrıca nəticə qaytarılır; səhv sətirlər qalanlarına mane olmur.
+    """
+    order_ids = {update_.order_id for update_ in data.updates}
+    current = dict((await db.execute(
+        select(Order.id, Order.status)
+        .where(Order.id.in_(order_ids))
+        .order_by(Order.id)
+        .with_for_update()
+    )).all())
+    
+    results, changes, seen = [], [], set()
+    for update_ in data.updates:
+        previous = current.get(update_.order_id)
+        error = None
+        if update_.order_id in seen:
+            error = "Sifariş bu sorğuda artıq var"
+        elif update_.status not in ORDER_STATUSES:
+            error = f"Status yalnız bunlardan biri ola bilər: {', '.join(ORDER_STATUSES)}"
+        elif previous is None:
+            error = "Sifariş tapılmadı"
+        elif not can_transition(previous, update_.status):
+            error = _transition_error(previous, update_.status)
+        seen.add(update_.order_id)
+        
+        if error is None:
+            changes.append((update_.order_id, previous, update_.status, update_.tracking_number))
+        results.append(OrderStatusResult(
+            order_id=update_.order_id,
+            success=error is None,
+            previous_status=previous,
+            status=update_.status if error is None else previous,
+            error=error
+        ))
+    
+    if changes:
+        rows = values(
+            column("id", Integer), column("previous", String), column("status", String), column("tracking_number", String),
+            name="changes"
+        ).data(changes)
+        # Sətirlər kilidlidir, əvvəlki status şərti yalnız əlavə qorumadır
+        await db.execute(
+            update(Order)
+            .where(Order.id == rows.c.id, Order.status == rows.c.previous)
+            .values(
+                status=rows.c.status,
+                tracking_number=func.coalesce(rows.c.tracking_number, Order.tracking_number),
+                updated_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+    
+    return BulkOrderStatusResponse(updated=len(changes), failed=len(results) - len(changes), results=results)
+
+
 # ============================================
 # STATISTICS & DASHBOARD
 # ============================================
 
 @router.get("/stats")
-def admin_get_statistics(
+async def admin_get_statistics(
+    exact: bool = Query(False, description="Sayğacları cədvəllərdən yenidən hesabla"),
     current_admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """ADMIN - Dashboard statistikaları"""
-    
-    from app.models.user import User
-    
-    total_products = db.query(Product).count()
-    total_categories = db.query(Category).count()
-    total_brands = db.query(Brand).count()
-    total_orders = db.query(Order).count()
-    total_users = db.query(User).count()
-    
-    # Orders by status
-    orders_pending = db.query(Order).filter(Order.status == "pending").count()
-    orders_confirmed = db.query(Order).filter(Order.status == "confirmed").count()
-    orders_shipped = db.query(Order).filter(Order.status == "shipped").count()
-    orders_delivered = db.query(Order).filter(Order.status == "delivered").count()
+    """
+    ADMIN - Dashboard statistikaları
     
-    # Low stock products
-    low_stock = db.query(Product).filter(Product.stock < 5).count()
+    Adi halda trigger-lərlə yenilənən stat_counters cəmlənir (cədvəl ölçüsündən asılı deyil).
+    exact=true bütün rəqəmləri bir aqreqat sorğusu ilə yenidən hesablayır və sayğacları düzəldir.
+    """
+    if exact:
+        counters = await recompute(db)
+    else:
+        counters = await read_counters(db)
+    await db.commit()
     
     return {
         "products": {
-            "total": total_products,
-            "low_stock": low_stock
+            "total": counters["products"],
+            "low_stock": counters["products:low_stock"]
         },
-        "categories": total_categories,
-        "brands": total_brands,
+        "categories": counters["categories"],
+        "brands": counters["brands"],
         "orders": {
-            "total": total_orders,
-            "pending": orders_pending,
-            "confirmed": orders_confirmed,
-            "shipped": orders_shipped,
-            "delivered": orders_delivered
+            "total": counters["orders"],
+            "pending": counters["orders:pending"],
+            "confirmed": counters["orders:confirmed"],
+            "shipped": counters["orders:shipped"],
+            "delivered": counters["orders:delivered"]
         },
-        "users": total_users
-    }
\ No newline at end of file
+        "users": counters["users"]
+    }
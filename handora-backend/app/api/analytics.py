@@ -0,0 +1,125 @@
+"""
+Admin satış analitikası - yalnız saatlıq/günlük rollup cədvəllərini oxuyur
+(app/core/analytics.py). Tarixlər UTC günləridir, date_from və date_to daxildir.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+from app.database import get_read_db
+from app.models.product import CategoryClosure
+from app.schemas.analytics import SalesSeries, TopSeller
+from app.core.security import get_current_admin
+from app.core.analytics import sales_series, top_sellers
+
+router = APIRouter(prefix="/admin/analytics", tags=["Admin Analytics"])
+
+GRANULARITY_PATTERN = "^(hour|day)$"
+# Bir sorğuda ən çox neçə gün (saatlıq: ~744 nöqtə, günlük: 3 il)
+MAX_DAYS = {"hour": 31, "day": 3 * 366}
+DEFAULT_DAYS = {"hour": 2, "day": 30}
+
+
+def _period(granularity: str, date_from: Optional[date], date_to: Optional[date]) -> tuple:
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_DAYS[granularity] - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from date_to-dan sonra ola bilməz")
+    if (date_to - date_from).days + 1 > MAX_DAYS[granularity]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"'{granularity}' üçün dövr ən çox {MAX_DAYS[granularity]} gün ola bilər"
+        )
+    return date_from, date_to
+
+
+async def _series(db: AsyncSession, granularity: str, dimension: str, key: int, keys: List[int],
+                  date_from: Optional[date], date_to: Optional[date]) -> dict:
+    date_from, date_to = _period(granularity, date_from, date_to)
+    return {
+        "dimension": dimension,
+        "key": key,
+        "granularity": granularity,
+        "date_from": date_from,
+        "date_to": date_to,
+        "points": await sales_series(db, granularity, dimension, keys, date_from, date_to)
+    }
+
+
+@router.get("/sales", response_model=SalesSeries)
+async def get_total_sales(
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """ADMIN - Ümumi gəlir, satılan ədəd və sifariş sayı"""
+    return await _series(db, granularity, "total", 0, [0], date_from, date_to)
+
+
+@router.get("/products/{product_id}/sales", response_model=SalesSeries)
+async def get_product_sales(
+    product_id: int,
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """ADMIN - Məhsul üzrə satış"""
+    return await _series(db, granularity, "product", product_id, [product_id], date_from, date_to)
+
+
+@router.get("/brands/{brand_id}/sales", response_model=SalesSeries)
+async def get_brand_sales(
+    brand_id: int,
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """ADMIN - Brend üzrə satış"""
+    return await _series(db, granularity, "brand", brand_id, [brand_id], date_from, date_to)
+
+
+@router.get("/categories/{category_id}/sales", response_model=SalesSeries)
+async def get_category_sales(
+    category_id: int,
+    granularity: str = Query("day", pattern=GRANULARITY_PATTERN),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    include_subcategories: bool = True,
+    current_admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    ADMIN - Kateqoriya üzrə satış
+
+    include_subcategories=true olduqda alt kateqoriyaların rollup-ları da cəmlənir
+    (sifariş sayı kateqoriyalar üzrə cəmdir - bir neçə alt kateqoriyadan alınan sifariş bir neçə dəfə sayılır).
+    """
+    keys = [category_id]
+    if include_subcategories:
+        keys = (await db.scalars(
+            select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+        )).all() or keys
+    return await _series(db, granularity, "category", category_id, keys, date_from, date_to)
+
+
+@router.get("/top/{dimension}", response_model=List[TopSeller])
+async def get_top_sellers(
+    dimension: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    current_admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """ADMIN - Dövr üzrə gəlirə görə ən çox satan məhsullar / brendlər / kateqoriyalar"""
+    if dimension not in ("product", "brand", "category"):
+        raise HTTPException(status_code=404, detail="Ölçü product, brand və ya category olmalıdır")
+    date_from, date_to = _period("day", date_from, date_to)
+    return await top_sellers(db, dimension, date_from, date_to, limit)
@@ -1,21 +1,34 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional
+from app.database import get_read_db
 from app.models.product import Brand, Product
 from app.schemas.product import BrandResponse, ProductResponse
+from app.schemas.pagination import CursorPage
+from app.core.pagination import paginate, PRODUCT_SORTS, PRODUCT_SORT_PATTERN
+from app.core.response_cache import cached_response, to_json
 
 router = APIRouter(prefix="/brands", tags=["Brands"])
 
 @router.get("", response_model=List[BrandResponse])
-def get_brands(db: Session = Depends(get_db)):
-    return db.query(Brand).all()
+async def get_brands(request: Request, db: AsyncSession = Depends(get_read_db)):
+    async def build(db: AsyncSession):
+        brands = (await db.scalars(select(Brand))).all()
+        return to_json(List[BrandResponse], brands)
 
-@router.get("/{brand_id}/products", response_model=List[ProductResponse])
-def get_brand_products(
+    return await cached_response(request, db, ["brands"], build)
+
+@router.get("/{brand_id}/products", response_model=CursorPage[ProductResponse])
+async def get_brand_products(
     brand_id: int,
-    skip: int = 0,
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    sort: str = Query("newest", pattern=PRODUCT_SORT_PATTERN),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    return db.query(Product).filter(Product.brand_id == brand_id).offset(skip).limit(limit).all()
\ No newline at end of file
+    stmt = select(Product).where(Product.brand_id == brand_id).options(joinedload(Product.brand))
+    items, next_cursor = await paginate(db, stmt, PRODUCT_SORTS[sort], cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
+
@@ -5,16 +5,22 @@ PUBLIC API - Categories (Yalnız GET əməliyyatları)
 Users can only VIEW categories, not modify them
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
-from app.database import get_db
-from app.models.product import Category, Product
+from app.database import get_read_db
+from app.models.product import Category
 from app.schemas.product import (
     ParentCategoryResponse,
     SubCategoryResponse,
     SubCategoryWithParent
 )
+from app.schemas.pagination import CursorPage
+from app.core.pagination import paginate, CATEGORY_SORT
+from app.core.category_tree import build_category_tree
+from app.core.response_cache import cached_response, to_json
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
@@ -23,24 +29,24 @@ router = APIRouter(prefix="/categories", tags=["Categories"])
 
 @router.get(
     "",
-    response_model=List[ParentCategoryResponse],
+    response_model=CursorPage[ParentCategoryResponse],
     summary="Bütün əsas kateqoriyaları gətir"
 )
-def get_parent_categories(
-    skip: int = Query(0, ge=0),
+async def get_parent_categories(
+    request: Request,
+    cursor: Optional[str] = None,
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     PUBLIC - Bütün əsas kateqoriyaları qaytarır (parent_id = NULL olan).
     """
-    categories = db.query(Category)\
-        .filter(Category.parent_id == None)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    async def build(db: AsyncSession):
+        stmt = select(Category).where(Category.parent_id == None)
+        items, next_cursor = await paginate(db, stmt, CATEGORY_SORT, cursor, limit)
+        return to_json(CursorPage[ParentCategoryResponse], {"items": items, "next_cursor": next_cursor})
     
-    return categories
+    return await cached_response(request, db, ["categories"], build)
 
 
 @router.get(
@@ -48,16 +54,16 @@ def get_parent_categories(
     response_model=ParentCategoryResponse,
     summary="ID-yə görə əsas kateqoriya gətir"
 )
-def get_parent_category(
+async def get_parent_category(
     category_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     PUBLIC - Verilən ID-yə görə əsas kateqoriya qaytarır.
     """
-    category = db.query(Category)\
-        .filter(Category.id == category_id, Category.parent_id == None)\
-        .first()
+    category = await db.scalar(
+        select(Category).where(Category.id == category_id, Category.parent_id == None)
+    )
     
     if not category:
         raise HTTPException(
@@ -73,17 +79,17 @@ def get_parent_category(
     response_model=List[SubCategoryResponse],
     summary="Əsas kateqoriyanın bütün alt kateqoriyalarını gətir"
 )
-def get_subcategories_by_parent(
+async def get_subcategories_by_parent(
     parent_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     PUBLIC - Verilən əsas kateqoriyanın bütün alt kateqoriyalarını qaytarır.
     """
     # Verify parent exists
-    parent = db.query(Category)\
-        .filter(Category.id == parent_id, Category.parent_id == None)\
-        .first()
+    parent = await db.scalar(
+        select(Category).where(Category.id == parent_id, Category.parent_id == None)
+    )
     
     if not parent:
         raise HTTPException(
@@ -91,38 +97,38 @@ def get_subcategories_by_parent(
             detail=f"ID {parent_id} ilə əsas kateqoriya tapılmadı"
         )
     
-    subcategories = db.query(Category)\
-        .filter(Category.parent_id == parent_id)\
-        .all()
+    subcategories = await db.scalars(
+        select(Category).where(Category.parent_id == parent_id)
+    )
     
-    return subcategories
+    return subcategories.all()
 
 
 # ==================== SUBCATEGORY PUBLIC ENDPOINTS ====================
 
 @router.get(
     "/subcategories/all",
-    response_model=List[SubCategoryWithParent],
+    response_model=CursorPage[SubCategoryWithParent],
     summary="Bütün alt kateqoriyaları gətir"
 )
-def get_all_subcategories(
+async def get_all_subcategories(
     parent_id: Optional[int] = Query(None, description="Əsas kateqoriya ID-si ilə filter"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     PUBLIC - Bütün alt kateqoriyaları qaytarır.
     parent_id parametri ilə müəyyən əsas kateqoriyanın alt kateqoriyalarını filtrləmək olar.
     """
-    query = db.query(Category).filter(Category.parent_id != None)
+    stmt = select(Category).where(Category.parent_id != None).options(joinedload(Category.parent))
     
     if parent_id:
-        query = query.filter(Category.parent_id == parent_id)
+        stmt = stmt.where(Category.parent_id == parent_id)
     
-    subcategories = query.offset(skip).limit(limit).all()
+    items, next_cursor = await paginate(db, stmt, CATEGORY_SORT, cursor, limit)
     
-    return subcategories
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get(
@@ -130,16 +136,18 @@ def get_all_subcategories(
     response_model=SubCategoryWithParent,
     summary="ID-yə görə alt kateqoriya gətir"
 )
-def get_subcategory(
+async def get_subcategory(
     subcategory_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     PUBLIC - Verilən ID-yə görə alt kateqoriya qaytarır.
     """
-    subcategory = db.query(Category)\
-        .filter(Category.id == subcategory_id, Category.parent_id != None)\
-        .first()
+    subcategory = await db.scalar(
+        select(Category)
+        .where(Category.id == subcategory_id, Category.parent_id != None)
+        .options(joinedload(Category.parent))
+    )
     
     if not subcategory:
         raise HTTPException(
@@ -156,54 +164,14 @@ def get_subcategory(
     "/tree/all",
     summary="Bütün kateqoriyaları ağac strukturunda gətir"
 )
-def get_categories_tree(db: Session = Depends(get_db)):
+async def get_categories_tree(request: Request, db: AsyncSession = Depends(get_read_db)):
     """
-    PUBLIC - Bütün əsas kateqoriyaları və onların alt kateqoriyalarını
-    ağac strukturunda qaytarır. Hər kateqoriya üçün məhsul sayını da əlavə edir.
+    PUBLIC - Bütün kateqoriyaları istənilən dərinlikdə ağac strukturunda qaytarır.
+    Hər kateqoriya üçün products_count (birbaşa) və total_products_count
+    (bütün alt kateqoriyalar daxil) əlavə olunur.
     """
-    # Get all parent categories
-    parent_categories = db.query(Category)\
-        .filter(Category.parent_id == None)\
-        .all()
+    # Məhsul sayları da olduğu üçün məhsul kataloqu dəyişəndə də yenilənir
+    async def build(db: AsyncSession):
+        return to_json(list, await build_category_tree(db))
     
-    result = []
-    
-    for parent in parent_categories:
-        # Get subcategories for this parent
-        subcategories = db.query(Category)\
-            .filter(Category.parent_id == parent.id)\
-            .all()
-        
-        # Build subcategory tree with product counts
-        subcategory_tree = []
-        total_products = 0
-        
-        for sub in subcategories:
-            # Count products in this subcategory
-            products_count = db.query(Product)\
-                .filter(Product.category_id == sub.id)\
-                .count()
-            
-            total_products += products_count
-            
-            subcategory_tree.append({
-                "id": sub.id,
-                "name_az": sub.name_az,
-                "name_en": sub.name_en,
-                "name_ru": sub.name_ru,
-                "slug": sub.slug,
-                "products_count": products_count
-            })
-        
-        # Build parent category tree
-        result.append({
-            "id": parent.id,
-            "name_az": parent.name_az,
-            "name_en": parent.name_en,
-            "name_ru": parent.name_ru,
-            "slug": parent.slug,
-            "subcategories": subcategory_tree,
-            "total_products_count": total_products
-        })
-    
-    return result
\ No newline at end of file
+    return await cached_response(request, db, ["categories", "products"], build)
@@ -0,0 +1,36 @@
+"""
+Şəkil resize proxy-si - /img/{en}x{hündürlük}/{açar}, məs. /img/300x300/products/<sha256>.jpg
+
+Şəkil verilən qutuya sığacaq qədər kiçildilir (nisbət saxlanılır, böyütmə olmur).
+Yalnız IMAGE_RESIZE_SIZES ölçüləri qəbul edilir; nəticə disk keşindən verilir
+(app/core/image_cache.py), başlıqlar /uploads ilə eynidir (app/core/image_files.py).
+"""
+from fastapi import APIRouter, HTTPException, Request
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+from app.core.config import settings
+from app.core.image_cache import resized_image
+from app.core.image_files import IMMUTABLE_CACHE_CONTROL, content_tag, image_file_response, is_not_modified
+from app.core.utils import PRODUCT_IMAGE_PREFIX
+
+router = APIRouter(prefix="/img", tags=["Images"])
+
+
+@router.get("/{size}/{key:path}")
+@router.head("/{size}/{key:path}", include_in_schema=False)
+async def get_resized_image(size: str, key: str, request: Request):
+    """Məhsul şəklinin icazəli ölçülərdən birinə kiçildilmiş nüsxəsi"""
+    if size not in settings.IMAGE_RESIZE_SIZES:
+        raise HTTPException(status_code=404, detail="Bu ölçü dəstəklənmir")
+    if not key.startswith(PRODUCT_IMAGE_PREFIX + "/") or ".." in key.split("/"):
+        raise HTTPException(status_code=404, detail="Şəkil tapılmadı")
+    
+    tag = content_tag(key)
+    if tag:
+        tag = f"{tag}-{size}"
+        # Hash-li orijinalın nüsxəsi də dəyişmir - tanış ETag üçün keşə baxmadan 304
+        if is_not_modified(Headers({"etag": f'"{tag}"'}), request.headers):
+            return NotModifiedResponse(Headers({"cache-control": IMMUTABLE_CACHE_CONTROL, "etag": f'"{tag}"'}))
+    
+    path, stat_result = await resized_image(key, size)
+    return image_file_response(path, stat_result, request.headers, tag)
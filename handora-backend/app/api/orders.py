@@ -1,73 +1,176 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy import Integer, column, insert, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
+from app.database import get_async_db
 from app.models.order import Order, OrderItem
 from app.models.product import Product
 from app.schemas.order import OrderCreate, OrderResponse
+from app.schemas.pagination import CursorPage
+from app.core.pagination import paginate, ORDER_SORTS
 from app.core.security import get_current_user
+from app.core.response_cache import bump_versions, to_json
+from app.core.idempotency import IDEMPOTENCY_HEADER, fingerprint, run_idempotent
+from app.core.inventory import consume_reservations, take_from_shards
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
-@router.post("", response_model=OrderResponse)
-def create_order(
-    order_data: OrderCreate,
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    total = 0
-    order_items = []
+async def _place_order(db: AsyncSession, user_id: int, order_data: OrderCreate) -> Order:
+    """
+    Sifariş bir tranzaksiyada yaradılır (commit çağıran edir):
+    adi məhsullar id sırası ilə bir FOR UPDATE sorğusu ilə kilidlənir (deadlock olmasın deyə)
+    və stok şərtli bulk UPDATE ilə azaldılır; sharded məhsullarda stok shard-dan götürülür,
+    rezervasiyası olan sətirlərin stoku isə artıq ayrılıb. Sətirlər bulk insert olunur.
+    Xəta olduqda session commit-siz bağlanır və hər şey geri qaytarılır.
+    """
+    # Rezervasiyalar stokdan əvvəl kilidlənir - reconciler ilə eyni sıra
+    reserved = [item for item in order_data.items if item.reservation_id is not None]
+    if reserved:
+        await consume_reservations(db, user_id, reserved)
+    
+    # Eyni məhsul bir neçə sətirdə gələ bilər - stok yoxlaması cəm miqdarla aparılır
+    quantities = {}
+    for item in order_data.items:
+        if item.reservation_id is None:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    
+    product_ids = sorted({item.product_id for item in order_data.items})
+    rows = await db.execute(
+        select(Product.id, Product.name_az, Product.price, Product.discount_price, Product.stock_shards)
+        .where(Product.id.in_(product_ids))
+    )
+    products = {row.id: row for row in rows}
+    
+    for product_id in product_ids:
+        if product_id not in products:
+            raise HTTPException(status_code=404, detail=f"Məhsul ID {product_id} tapılmadı")
+    
+    # Sharded məhsulların sətri kilidlənmir - bütün checkout-lar onu gözləməsin
+    plain = [product_id for product_id in sorted(quantities) if not products[product_id].stock_shards]
+    sharded = [product_id for product_id in sorted(quantities) if products[product_id].stock_shards]
+    
+    if plain:
+        locked = await db.execute(
+            select(Product.id, Product.name_az, Product.stock, Product.stock_shards)
+            .where(Product.id.in_(plain))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+        for row in locked.all():
+            if row.stock_shards:
+                # Kilidi gözləyərkən shard-lara bölünüb
+                plain.remove(row.id)
+                sharded.append(row.id)
+            elif row.stock < quantities[row.id]:
+                raise HTTPException(status_code=400, detail=f"{row.name_az} stokda yoxdur")
+        sharded.sort()
+    
+    if plain:
+        # Sətirlər kilidli olsa da stok şərti UPDATE-in özündə də yoxlanılır
+        changes = values(
+            column("id", Integer), column("quantity", Integer), name="changes"
+        ).data([(product_id, quantities[product_id]) for product_id in plain])
+        updated = await db.execute(
+            update(Product)
+            .where(Product.id == changes.c.id, Product.stock >= changes.c.quantity)
+            .values(stock=Product.stock - changes.c.quantity)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+        if len(updated.all()) != len(plain):
+            raise HTTPException(status_code=409, detail="Stok dəyişdi, sifarişi yenidən göndərin")
     
+    for product_id in sharded:
+        if await take_from_shards(db, product_id, quantities[product_id]) is None:
+            raise HTTPException(status_code=400, detail=f"{products[product_id].name_az} stokda yoxdur")
+    
+    order_items = []
+    total = 0
     for item in order_data.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=f"Məhsul ID {item.product_id} tapılmadı")
-        if product.stock < item.quantity:
-            raise HTTPException(status_code=400, detail=f"{product.name_az} stokda yoxdur")
-        
+        product = products[item.product_id]
         price = product.discount_price if product.discount_price else product.price
         total += price * item.quantity
         order_items.append({
-            "product_id": product.id,
+            "product_id": item.product_id,
             "quantity": item.quantity,
             "price": price
         })
-        product.stock -= item.quantity
     
     new_order = Order(
-        user_id=current_user.id,
+        user_id=user_id,
         total_amount=total,
         shipping_address=order_data.shipping_address
     )
     db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
+    await db.flush()
     
-    for item_data in order_items:
-        order_item = OrderItem(order_id=new_order.id, **item_data)
-        db.add(order_item)
+    await db.execute(insert(OrderItem), [{"order_id": new_order.id, **item} for item in order_items])
     
-    db.commit()
-    db.refresh(new_order)
+    # Stok dəyişdiyi üçün məhsul keşləri köhnəlir.
+    # Sharded məhsulların keşi reconciler-də yenilənir - hər sifariş eyni versiya sətrini kilidləməsin
+    await bump_versions(db, *[f"product:{product_id}" for product_id in plain])
+    await db.refresh(new_order, ["items"])
     return new_order
 
+
+@router.post("", response_model=OrderResponse)
+async def create_order(
+    order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Yeni sifariş. Idempotency-Key header-i ilə təkrar göndərilən sorğu
+    yeni sifariş yaratmır, ilk cavab qaytarılır.
+    """
+    async def handler():
+        order = await _place_order(db, current_user.id, order_data)
+        return to_json(OrderResponse, order)
+    
+    return await run_idempotent(
+        db, idempotency_key, f"{current_user.id}:POST /orders",
+        fingerprint(order_data.model_dump_json()), handler
+    )
+
 @router.get("/{order_id}", response_model=OrderResponse)
-def get_order(
+async def get_order(
     order_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.user_id == current_user.id
-    ).first()
+    order = await db.scalar(
+        select(Order)
+        .where(Order.id == order_id, Order.user_id == current_user.id)
+        .options(selectinload(Order.items))
+    )
     if not order:
         raise HTTPException(status_code=404, detail="Sifariş tapılmadı")
     return order
 
-@router.get("", response_model=List[OrderResponse])
-def get_my_orders(
+@router.get("", response_model=CursorPage[OrderResponse])
+async def get_my_orders(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    date_from: Optional[datetime] = Query(None, description="Bu tarixdən (daxil)"),
+    date_to: Optional[datetime] = Query(None, description="Bu tarixədək (daxil deyil)"),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return db.query(Order).filter(Order.user_id == current_user.id).all()
\ No newline at end of file
+    """
+    Sifariş tarixçəsi - yenilər əvvəl, cursor ilə səhifələnir.
+    Sətirlər bir əlavə sorğu ilə (selectinload) yüklənir, sifariş sayından asılı deyil.
+    """
+    stmt = select(Order)\
+        .where(Order.user_id == current_user.id)\
+        .options(selectinload(Order.items))
+    
+    if date_from:
+        stmt = stmt.where(Order.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(Order.created_at < date_to)
+    
+    items, next_cursor = await paginate(db, stmt, ORDER_SORTS["newest"], cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
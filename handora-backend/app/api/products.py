@@ -1,90 +1,166 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_read_db, read_session
 from app.models.product import Product
-from app.schemas.product import ProductResponse, ProductDetail, ProductFilter
+from app.schemas.product import ProductResponse, ProductDetail, ProductFilter, ProductFacets
+from app.schemas.pagination import CursorPage
+from app.core.search import apply_search, filter_search
+from app.core.pagination import paginate, PRODUCT_SORTS, PRODUCT_SORT_PATTERN
+from app.core.category_tree import filter_by_category
+from app.core.facets import compute_facets
+from app.core.response_cache import cached_response, to_json
 # from sqlalchemy import or_
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
-@router.get("", response_model=List[ProductResponse])
-def get_products(
-    skip: int = Query(0, ge=0),
+@router.get("", response_model=CursorPage[ProductResponse])
+async def get_products(
+    cursor: Optional[str] = None,
     limit: int = Query(20, ge=1, le=100),
+    sort: str = Query("newest", pattern=PRODUCT_SORT_PATTERN),
     category_id: Optional[int] = None,
+    include_subcategories: bool = Query(True, description="Alt kateqoriyaların məhsulları da daxil olsun"),
     brand_id: Optional[int] = None,
     is_sale: Optional[bool] = None,
     is_new: Optional[bool] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Query(None, pattern="^(az|en|ru)$"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Product)
+    stmt = select(Product).options(joinedload(Product.brand))
     
     if category_id:
-        query = query.filter(Product.category_id == category_id)
+        stmt = filter_by_category(stmt, category_id, include_subcategories)
     if brand_id:
-        query = query.filter(Product.brand_id == brand_id)
+        stmt = stmt.where(Product.brand_id == brand_id)
     if is_sale is not None:
-        query = query.filter(Product.is_sale == is_sale)
+        stmt = stmt.where(Product.is_sale == is_sale)
     if is_new is not None:
-        query = query.filter(Product.is_new == is_new)
+        stmt = stmt.where(Product.is_new == is_new)
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Product.name_az.ilike(search_filter)) |
-            (Product.name_en.ilike(search_filter)) |
-            (Product.name_ru.ilike(search_filter))
-        )
+        stmt = filter_search(stmt, search, lang)
     
-    return query.offset(skip).limit(limit).all()
-
+    items, next_cursor = await paginate(db, stmt, PRODUCT_SORTS[sort], cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
 
-@router.get("/filter", response_model=List[ProductFilter])
-def get_products(
-    filters: ProductFilter = Depends(),
-    db: Session = Depends(get_db)
-):
-    query = db.query(Product)
 
+def _apply_filters(stmt, filters: ProductFilter):
     if filters.category_id is not None:
-        query = query.filter(Product.category_id == filters.category_id)
+        stmt = filter_by_category(stmt, filters.category_id)
 
     if filters.brand_id is not None:
-        query = query.filter(Product.brand_id == filters.brand_id)
+        stmt = stmt.where(Product.brand_id == filters.brand_id)
 
     if filters.is_new is not None:
-        query = query.filter(Product.is_new == filters.is_new)
+        stmt = stmt.where(Product.is_new == filters.is_new)
 
     if filters.is_sale is not None:
-        query = query.filter(Product.is_sale == filters.is_sale)
+        stmt = stmt.where(Product.is_sale == filters.is_sale)
 
     if filters.min_price is not None:
-        query = query.filter(Product.price >= filters.min_price)
+        stmt = stmt.where(Product.price >= filters.min_price)
 
     if filters.max_price is not None:
-        query = query.filter(Product.price <= filters.max_price)
+        stmt = stmt.where(Product.price <= filters.max_price)
 
     if filters.search:
-        query = query.filter(Product.name.ilike(f"%{filters.search}%"))
+        stmt = filter_search(stmt, filters.search)
+
+    return stmt
 
-    return query.all()
+
+# NDJSON rejimində serverdən bir dəfəyə oxunan sətir sayı
+STREAM_BATCH_SIZE = 500
+
+
+async def _stream_products(filters: ProductFilter, sort: str):
+    """
+    Məhsulları server-side cursor (yield_per) ilə oxuyub NDJSON sətirləri kimi verir.
+    Response göndərilərkən request-in session-u artıq bağlı ola bilər, buna görə öz session-u var.
+    """
+    async with read_session() as db:
+        spec = PRODUCT_SORTS[sort]
+        order_by = [column.desc() if spec.descending else column.asc() for column in spec.columns]
+        stmt = _apply_filters(select(Product), filters)\
+            .options(joinedload(Product.brand))\
+            .order_by(*order_by)\
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+
+        async for product in await db.stream_scalars(stmt):
+            yield ProductResponse.model_validate(product).model_dump_json() + "\n"
+
+
+@router.get("/filter", response_model=CursorPage[ProductResponse])
+async def get_products(
+    filters: ProductFilter = Depends(),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    sort: str = Query("newest", pattern=PRODUCT_SORT_PATTERN),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson - bütün nəticələri axınla qaytarır"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Filtrə uyğun məhsullar.
+    - json: cursor ilə səhifələnmiş cavab (maksimum 100 məhsul)
+    - ndjson: bütün nəticələr hər sətirdə bir məhsul olmaqla axınla göndərilir, yaddaş sabit qalır
+    """
+    if format == "ndjson":
+        return StreamingResponse(_stream_products(filters, sort), media_type="application/x-ndjson")
+
+    stmt = _apply_filters(select(Product), filters).options(joinedload(Product.brand))
+    items, next_cursor = await paginate(db, stmt, PRODUCT_SORTS[sort], cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/facets", response_model=ProductFacets)
+async def get_product_facets(
+    request: Request,
+    filters: ProductFilter = Depends(),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Filtr paneli üçün cari filtrə uyğun məhsul sayları:
+    brend, kateqoriya, qiymət aralığı və is_new/is_sale üzrə.
+    Məhsul, kateqoriya və ya brend dəyişən kimi yenidən hesablanır.
+    """
+    async def build(db: AsyncSession):
+        return to_json(ProductFacets, await compute_facets(db, _apply_filters(select(Product), filters)))
+    
+    return await cached_response(request, db, ["products", "categories", "brands"], build)
 
 @router.get("/search", response_model=List[ProductResponse])
-def search_products(search: str, db: Session = Depends(get_db)):
-    search_filter = f"%{search}%"
-    return db.query(Product).filter(
-        (Product.name_az.ilike(search_filter)) |
-        (Product.name_en.ilike(search_filter)) |
-        (Product.name_ru.ilike(search_filter)) |
-        (Product.description_az.ilike(search_filter))
-    ).limit(20).all()
+async def search_products(
+    search: str = Query(..., min_length=1),
+    lang: Optional[str] = Query(None, pattern="^(az|en|ru)$", description="Yalnız bu dildə axtar"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Full-text axtarış (az/en/ru). Nəticələr uyğunluğa görə sıralanır -
+    addakı uyğunluq təsvirdəkindən yüksək qiymətləndirilir.
+    """
+    stmt = apply_search(select(Product).options(joinedload(Product.brand)), search, lang)
+    result = await db.scalars(stmt.offset(skip).limit(limit))
+    return result.all()
 
 
 @router.get("/{product_id}", response_model=ProductDetail)
-def get_product(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Məhsul tapılmadı")
-    return product
+async def get_product(product_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    async def build(db: AsyncSession):
+        product = await db.scalar(
+            select(Product)
+            .where(Product.id == product_id)
+            .options(joinedload(Product.brand), joinedload(Product.category))
+        )
+        if not product:
+            raise HTTPException(status_code=404, detail="Məhsul tapılmadı")
+        return to_json(ProductDetail, product)
+
+    # Cavabda brend və kateqoriya da var
+    return await cached_response(request, db, [f"product:{product_id}", "brands", "categories"], build)
 
@@ -0,0 +1,56 @@
+"""
+Stok rezervasiyaları - səbət/checkout zamanı stok RESERVATION_TTL_SECONDS müddətinə ayrılır.
+Sifarişdə sətrin reservation_id-si göstərilir; istifadə olunmayan rezervasiya
+vaxtı bitəndə avtomatik stoka qaytarılır.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.database import get_async_db
+from app.models.inventory import InventoryReservation
+from app.schemas.inventory import ReservationCreate, ReservationResponse
+from app.core.security import get_current_user
+from app.core.inventory import reserve, release_reservation
+
+router = APIRouter(prefix="/reservations", tags=["Reservations"])
+
+@router.post("", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
+async def create_reservation(
+    data: ReservationCreate,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    reservation = await reserve(db, current_user.id, data.product_id, data.quantity)
+    await db.commit()
+    return reservation
+
+@router.get("", response_model=List[ReservationResponse])
+async def get_my_reservations(
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.scalars(
+        select(InventoryReservation)
+        .where(InventoryReservation.user_id == current_user.id, InventoryReservation.expires_at > func.now())
+        .order_by(InventoryReservation.id)
+    )
+    return result.all()
+
+@router.delete("/{reservation_id}")
+async def cancel_reservation(
+    reservation_id: int,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    reservation = await db.scalar(
+        select(InventoryReservation)
+        .where(InventoryReservation.id == reservation_id, InventoryReservation.user_id == current_user.id)
+        .with_for_update()
+    )
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Rezervasiya tapılmadı")
+    
+    await release_reservation(db, reservation)
+    await db.commit()
+    return {"message": "Rezervasiya ləğv edildi"}
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List
 from pydantic import BaseModel, Field
-from app.database import get_db
+from app.database import get_read_db
 from app.models.product import Product
 from app.schemas.product import ProductResponse
 
@@ -11,15 +13,15 @@ from app.core.config import SUGGESTION_PRODUCT_IDS
 router = APIRouter(prefix="/suggestion", tags=["Suggestion"])
 
 @router.get("/", response_model=List[ProductResponse])
-def get_suggestions(db: Session = Depends(get_db)):
+async def get_suggestions(db: AsyncSession = Depends(get_read_db)):
     """
     Backend-də saxlanan suggestion product list-ni qaytarır.
     """
-    products = (
-        db.query(Product)
-        .filter(Product.id.in_(SUGGESTION_PRODUCT_IDS))
-        .all()
-    )
+    products = (await db.scalars(
+        select(Product)
+        .where(Product.id.in_(SUGGESTION_PRODUCT_IDS))
+        .options(joinedload(Product.brand))
+    )).all()
 
     # Config-dəki sıralamanı qoruyur
     product_map = {p.id: p for p in products}
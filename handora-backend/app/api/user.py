@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.schemas.user import UserResponse, PasswordUpdate
 from app.models.user import User
-from app.core.security import get_current_user, verify_password, hash_password
+from app.core.security import get_current_user, verify_password_async, hash_password_async, UserPrincipal
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_profile(
-    current_user: User = Depends(get_current_user)
+async def get_current_user_profile(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cari istifadəçinin profil məlumatlarını qaytarır
@@ -20,14 +21,14 @@ def get_current_user_profile(
     Returns:
     - User məlumatları (id, email, full_name, phone, created_at)
     """
-    return current_user
+    return await db.get(User, current_user.id)
 
 
 @router.put("/update-password", status_code=status.HTTP_200_OK)
-def update_user_password(
+async def update_user_password(
     password_data: PasswordUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Cari istifadəçinin şifrəsini yeniləyir
@@ -45,17 +46,18 @@ def update_user_password(
     - 400: Mövcud şifrə səhvdir
     - 401: Token yoxdur və ya düzgün deyil
     """
+    user = await db.get(User, current_user.id)
+    
     # Mövcud şifrəni yoxla
-    if not verify_password(password_data.current_password, current_user.password_hash):
+    if not await verify_password_async(password_data.current_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Mövcud şifrə səhvdir"
         )
     
-    # Yeni şifrəni hash-lə və yadda saxla
-    current_user.password_hash = hash_password(password_data.new_password)
-    db.commit()
-    db.refresh(current_user)
+    # Yeni şifrəni hash-lə və yadda saxla (keşlənmiş principal flush zamanı etibarsız olur)
+    user.password_hash = await hash_password_async(password_data.new_password)
+    await db.commit()
     
     return {
         "message": "Şifrə uğurla yeniləndi",
@@ -1,58 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional
+from app.database import get_async_db, get_read_db
 from app.models.order import WishlistItem
 from app.models.product import Product
 from app.schemas.product import ProductResponse
 from app.core.security import get_current_user
+from app.core.idempotency import IDEMPOTENCY_HEADER, fingerprint, run_idempotent
 
 router = APIRouter(prefix="/wishlist", tags=["Wishlist"])
 
 @router.post("")
-def add_to_wishlist(
+async def add_to_wishlist(
     product_id: int,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    existing = db.query(WishlistItem).filter(
-        WishlistItem.user_id == current_user.id,
-        WishlistItem.product_id == product_id
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Məhsul artıq istək siyahısındadır")
+    async def handler():
+        existing = await db.scalar(select(WishlistItem).where(
+            WishlistItem.user_id == current_user.id,
+            WishlistItem.product_id == product_id
+        ))
+        
+        if existing:
+            raise HTTPException(status_code=400, detail="Məhsul artıq istək siyahısındadır")
+        
+        wishlist_item = WishlistItem(user_id=current_user.id, product_id=product_id)
+        db.add(wishlist_item)
+        await db.flush()
+        return json.dumps({"message": "İstək siyahısına əlavə edildi"}, ensure_ascii=False).encode()
     
-    wishlist_item = WishlistItem(user_id=current_user.id, product_id=product_id)
-    db.add(wishlist_item)
-    db.commit()
-    return {"message": "İstək siyahısına əlavə edildi"}
+    return await run_idempotent(
+        db, idempotency_key, f"{current_user.id}:POST /wishlist", fingerprint(product_id), handler
+    )
 
 @router.delete("/{product_id}")
-def remove_from_wishlist(
+async def remove_from_wishlist(
     product_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    item = db.query(WishlistItem).filter(
+    item = await db.scalar(select(WishlistItem).where(
         WishlistItem.user_id == current_user.id,
         WishlistItem.product_id == product_id
-    ).first()
+    ))
     
     if not item:
         raise HTTPException(status_code=404, detail="Məhsul tapılmadı")
     
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
     return {"message": "Silindi"}
 
 @router.get("", response_model=List[ProductResponse])
-def get_my_wishlist(
+async def get_my_wishlist(
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    wishlist_items = db.query(WishlistItem).filter(
-        WishlistItem.user_id == current_user.id
-    ).all()
-    product_ids = [item.product_id for item in wishlist_items]
-    return db.query(Product).filter(Product.id.in_(product_ids)).all()
\ No newline at end of file
+    product_ids = select(WishlistItem.product_id).where(WishlistItem.user_id == current_user.id)
+    result = await db.scalars(
+        select(Product)
+        .where(Product.id.in_(product_ids))
+        .options(joinedload(Product.brand))
+    )
+    return result.all()
\ No newline at end of file
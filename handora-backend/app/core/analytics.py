@@ -0,0 +1,183 @@
+# ==================== app/core/analytics.py ====================
+"""
+Satış analitikası - saatlıq və günlük rollup-lar
+
+Sifariş yarananda və ya ləğv edildikdə trigger sales_rollup_queue-ya sətir yazır
+(app/models/analytics.py). run_sales_rollup həmin növbəni hissə-hissə götürür,
+sətirləri order_items/products ilə birləşdirib (məhsul, brend, kateqoriya, ümumi)
+ölçüləri üzrə sales_hourly və sales_daily cədvəllərinə əlavə edir.
+/admin/analytics endpoint-ləri yalnız rollup-ları oxuyur.
+
+Vaxt kovaları sifarişin created_at-ı üzrədir (UTC) - ləğv edilən sifariş
+yarandığı saatdan/gündən çıxılır.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import List
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.analytics import SalesHourly, SalesDaily, SalesRollupQueue
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_BATCH_SIZE = 500
+# pg_try_advisory_xact_lock açarı - rollup sətirlərini bir anda yalnız bir worker yeniləyir
+ROLLUP_LOCK_ID = 0x73616C65  # "sale"
+
+GRANULARITIES = {"hour": SalesHourly, "day": SalesDaily}
+
+
+def _add(rollup: dict, seen: set, row_key: tuple, order_id: int, sign: int, revenue: float, units: int):
+    totals = rollup[row_key]
+    totals[0] += sign * revenue
+    totals[1] += sign * units
+    if (row_key, order_id) not in seen:
+        seen.add((row_key, order_id))
+        totals[2] += sign
+
+
+async def _upsert(db: AsyncSession, model, rollup: dict):
+    if not rollup:
+        return
+    stmt = pg_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[model.dimension, model.key, model.bucket],
+        set_={
+            "revenue": model.revenue + stmt.excluded.revenue,
+            "units": model.units + stmt.excluded.units,
+            "orders": model.orders + stmt.excluded.orders,
+        }
+    )
+    await db.execute(stmt, [
+        {"dimension": dimension, "key": key, "bucket": bucket, "revenue": revenue, "units": units, "orders": orders}
+        for (dimension, key, bucket), (revenue, units, orders) in sorted(rollup.items())
+    ])
+
+
+async def fold_queue(db: AsyncSession, batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+    """Növbədən bir hissə götürüb rollup-lara yazır, emal olunan növbə sətirlərinin sayını qaytarır"""
+    batch = select(SalesRollupQueue.id)\
+        .order_by(SalesRollupQueue.id)\
+        .limit(batch_size)\
+        .with_for_update(skip_locked=True)
+    entries = (await db.execute(
+        delete(SalesRollupQueue)
+        .where(SalesRollupQueue.id.in_(batch.scalar_subquery()))
+        .returning(SalesRollupQueue.order_id, SalesRollupQueue.sign)
+    )).all()
+
+    # Eyni hissədə ləğv edilib geri qaytarılan sifariş bir-birini silir
+    signs = defaultdict(int)
+    for entry in entries:
+        signs[entry.order_id] += entry.sign
+    signs = {order_id: sign for order_id, sign in signs.items() if sign}
+    if not signs:
+        return len(entries)
+
+    lines = await db.execute(
+        select(
+            Order.id, Order.created_at, OrderItem.product_id, OrderItem.quantity, OrderItem.price,
+            Product.brand_id, Product.category_id
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(Product, Product.id == OrderItem.product_id)
+        .where(Order.id.in_(signs))
+    )
+
+    hourly, daily = defaultdict(lambda: [0.0, 0, 0]), defaultdict(lambda: [0.0, 0, 0])
+    hourly_seen, daily_seen = set(), set()
+    for line in lines:
+        sign = signs[line.id]
+        hour = line.created_at.replace(minute=0, second=0, microsecond=0)
+        dimensions = [("total", 0), ("product", line.product_id)]
+        if line.brand_id is not None:
+            dimensions.append(("brand", line.brand_id))
+        if line.category_id is not None:
+            dimensions.append(("category", line.category_id))
+        revenue = line.price * line.quantity
+        for dimension, key in dimensions:
+            _add(hourly, hourly_seen, (dimension, key, hour), line.id, sign, revenue, line.quantity)
+            _add(daily, daily_seen, (dimension, key, hour.date()), line.id, sign, revenue, line.quantity)
+
+    await _upsert(db, SalesHourly, hourly)
+    await _upsert(db, SalesDaily, daily)
+    return len(entries)
+
+
+async def run_sales_rollup():
+    """App işlədikcə hər SALES_ROLLUP_SECONDS-da bir növbəni rollup-lara köçürür"""
+    while True:
+        try:
+            processed = ROLLUP_BATCH_SIZE
+            while processed == ROLLUP_BATCH_SIZE:
+                async with AsyncSessionLocal() as db:
+                    if not await db.scalar(select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_ID))):
+                        break
+                    processed = await fold_queue(db)
+                    await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Satış rollup-ları yenilənmədi")
+        await asyncio.sleep(settings.SALES_ROLLUP_SECONDS)
+
+
+def bucket_range(granularity: str, date_from: date, date_to: date) -> tuple:
+    """Daxil olan [date_from, date_to] günlərini kova tipinə uyğun yarımaçıq intervala çevirir"""
+    end = date_to + timedelta(days=1)
+    if granularity == "hour":
+        return datetime.combine(date_from, datetime.min.time()), datetime.combine(end, datetime.min.time())
+    return date_from, end
+
+
+async def sales_series(
+    db: AsyncSession,
+    granularity: str,
+    dimension: str,
+    keys: List[int],
+    date_from: date,
+    date_to: date
+) -> list:
+    """Bir və ya bir neçə açarın (məs. kateqoriya + alt kateqoriyalar) kovalar üzrə cəmi"""
+    model = GRANULARITIES[granularity]
+    start, end = bucket_range(granularity, date_from, date_to)
+    rows = await db.execute(
+        select(
+            model.bucket,
+            func.sum(model.revenue).label("revenue"),
+            func.sum(model.units).label("units"),
+            func.sum(model.orders).label("orders")
+        )
+        .where(model.dimension == dimension, model.key.in_(keys), model.bucket >= start, model.bucket < end)
+        .group_by(model.bucket)
+        .order_by(model.bucket)
+    )
+    return [row._asdict() for row in rows]
+
+
+async def top_sellers(
+    db: AsyncSession,
+    dimension: str,
+    date_from: date,
+    date_to: date,
+    limit: int
+) -> list:
+    """Dövr üzrə gəlirə görə ən yaxşı açarlar (günlük rollup-dan)"""
+    start, end = bucket_range("day", date_from, date_to)
+    stmt = select(
+        SalesDaily.key,
+        func.sum(SalesDaily.revenue).label("revenue"),
+        func.sum(SalesDaily.units).label("units"),
+        func.sum(SalesDaily.orders).label("orders")
+    ).where(SalesDaily.dimension == dimension, SalesDaily.bucket >= start, SalesDaily.bucket < end)
+    rows = await db.execute(
+        stmt.group_by(SalesDaily.key).order_by(func.sum(SalesDaily.revenue).desc()).limit(limit)
+    )
+    return [row._asdict() for row in rows]
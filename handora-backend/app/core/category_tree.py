@@ -0,0 +1,140 @@
+# ==================== app/core/category_tree.py ====================
+"""
+Kateqoriya ağacı - closure cədvəli (category_closure)
+
+Admin kateqoriya endpointləri hər yaradılma/köçürmədə cədvəli yeniləyir,
+silinmədə sətirlər FK ON DELETE CASCADE ilə təmizlənir.
+Bu sayədə istənilən dərinlikdə ağac və "bütün alt kateqoriyaların məhsulları"
+bir sorğu ilə alınır.
+"""
+from typing import Optional
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from app.models.product import Category, CategoryClosure, Product
+
+_CLOSURE_COLUMNS = ["ancestor_id", "descendant_id", "depth"]
+
+
+async def add_category_node(db: AsyncSession, category_id: int, parent_id: Optional[int]):
+    """Yeni kateqoriya üçün closure sətirlərini əlavə edir (flush-dan sonra çağırılmalıdır)"""
+    await db.execute(insert(CategoryClosure).values(ancestor_id=category_id, descendant_id=category_id, depth=0))
+
+    if parent_id:
+        ancestors = select(
+            CategoryClosure.ancestor_id,
+            literal(category_id),
+            CategoryClosure.depth + 1
+        ).where(CategoryClosure.descendant_id == parent_id)
+        await db.execute(insert(CategoryClosure).from_select(_CLOSURE_COLUMNS, ancestors))
+
+
+async def is_descendant(db: AsyncSession, category_id: int, ancestor_id: int) -> bool:
+    """category_id ancestor_id-nin alt ağacındadırmı (özü də daxil)"""
+    link = await db.scalar(
+        select(CategoryClosure.depth).where(
+            CategoryClosure.ancestor_id == ancestor_id,
+            CategoryClosure.descendant_id == category_id
+        )
+    )
+    return link is not None
+
+
+async def move_category_node(db: AsyncSession, category_id: int, new_parent_id: Optional[int]):
+    """Kateqoriyanı bütün alt ağacı ilə birlikdə yeni parent altına köçürür"""
+    subtree = aliased(CategoryClosure)
+    subtree_ids = select(subtree.descendant_id).where(subtree.ancestor_id == category_id)
+
+    # Alt ağacın köhnə əcdadlarla əlaqələrini sil (alt ağacın daxili əlaqələri qalır)
+    await db.execute(
+        delete(CategoryClosure).where(
+            CategoryClosure.descendant_id.in_(subtree_ids),
+            CategoryClosure.ancestor_id.not_in(subtree_ids)
+        )
+    )
+
+    if new_parent_id:
+        supertree = aliased(CategoryClosure)
+        links = select(
+            supertree.ancestor_id,
+            subtree.descendant_id,
+            supertree.depth + subtree.depth + 1
+        ).where(
+            supertree.descendant_id == new_parent_id,
+            subtree.ancestor_id == category_id
+        )
+        await db.execute(insert(CategoryClosure).from_select(_CLOSURE_COLUMNS, links))
+
+
+def rebuild_category_closure(db: Session):
+    """
+    Closure cədvəlini parent_id-lərdən tam yenidən qurur (mövcud baza üçün).
+    Skriptdən çağırıldığı üçün sync session qəbul edir.
+    """
+    tree = select(
+        Category.id.label("ancestor_id"),
+        Category.id.label("descendant_id"),
+        literal(0).label("depth")
+    ).cte("tree", recursive=True)
+    child = aliased(Category)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.id, tree.c.depth + 1)
+        .where(child.parent_id == tree.c.descendant_id)
+    )
+
+    db.execute(delete(CategoryClosure))
+    db.execute(insert(CategoryClosure).from_select(_CLOSURE_COLUMNS, select(tree)))
+
+
+def filter_by_category(stmt, category_id: int, include_descendants: bool = True):
+    """Məhsulları kateqoriyaya görə filtrləyir, istəyə görə bütün alt kateqoriyalar da daxil"""
+    if not include_descendants:
+        return stmt.where(Product.category_id == category_id)
+    return stmt.join(
+        CategoryClosure, CategoryClosure.descendant_id == Product.category_id
+    ).where(CategoryClosure.ancestor_id == category_id)
+
+
+async def build_category_tree(db: AsyncSession) -> list:
+    """
+    Bütün ağacı bir aqreqat sorğu ilə qurur.
+    products_count - birbaşa kateqoriyadakı, total_products_count - bütün alt ağacdakı məhsullar.
+    """
+    result = await db.execute(select(
+        Category.id,
+        Category.name_az,
+        Category.name_en,
+        Category.name_ru,
+        Category.slug,
+        Category.parent_id,
+        func.count(Product.id).filter(CategoryClosure.depth == 0).label("products_count"),
+        func.count(Product.id).label("total_products_count")
+    ).outerjoin(CategoryClosure, CategoryClosure.ancestor_id == Category.id)
+        .outerjoin(Product, Product.category_id == CategoryClosure.descendant_id)
+        .group_by(Category.id)
+        .order_by(Category.id)
+    )
+    rows = result.all()
+
+    nodes = {}
+    for row in rows:
+        nodes[row.id] = {
+            "id": row.id,
+            "name_az": row.name_az,
+            "name_en": row.name_en,
+            "name_ru": row.name_ru,
+            "slug": row.slug,
+            "products_count": row.products_count,
+            "total_products_count": row.total_products_count,
+            "subcategories": []
+        }
+
+    roots = []
+    for row in rows:
+        parent = nodes.get(row.parent_id)
+        if parent is None:
+            roots.append(nodes[row.id])
+        else:
+            parent["subcategories"].append(nodes[row.id])
+
+    return roots
@@ -0,0 +1,75 @@
+# ==================== app/core/facets.py ====================
+"""
+Məhsul facet-ləri - filtr paneli üçün brend, kateqoriya, qiymət aralığı
+və is_new/is_sale sayları bir GROUPING SETS sorğusu ilə hesablanır.
+Keşləmə /products/facets-də cached_response ilə (products/categories/brands versiyaları) olur.
+"""
+from sqlalchemy import func, literal_column, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.product import Product
+
+# Qiymət aralıqlarının sərhədləri (AZN) - sonuncu aralıq yuxarıdan açıqdır
+PRICE_BUCKETS = [0, 25, 50, 100, 250, 500, 1000]
+
+
+def _price_bucket(index: int) -> dict:
+    upper = PRICE_BUCKETS[index] if index < len(PRICE_BUCKETS) else None
+    return {"min": PRICE_BUCKETS[index - 1], "max": upper}
+
+
+async def compute_facets(db: AsyncSession, stmt) -> dict:
+    """Artıq filtrlənmiş Product statement-i üçün facet saylarını qaytarır"""
+    # Sərhədlər SQL-ə literal kimi yazılır ki, SELECT və GROUP BY ifadələri eyni olsun
+    thresholds = literal_column(f"ARRAY[{', '.join(str(b) for b in PRICE_BUCKETS)}]::float8[]")
+    bucket = func.width_bucket(Product.price, thresholds)
+    dimensions = {
+        "brands": Product.brand_id,
+        "categories": Product.category_id,
+        "price_buckets": bucket,
+        "is_new": Product.is_new,
+        "is_sale": Product.is_sale,
+    }
+
+    rows = await db.execute(
+        stmt.with_only_columns(
+            *[column.label(name) for name, column in dimensions.items()],
+            *[func.grouping(column).label(f"g_{name}") for name, column in dimensions.items()],
+            func.count(Product.id).label("count"),
+            maintain_column_froms=True
+        ).group_by(
+            func.grouping_sets(*[column for column in dimensions.values()], tuple_())
+        ).order_by(None)
+    )
+
+    result = {
+        "total": 0,
+        "brands": [],
+        "categories": [],
+        "price_buckets": [],
+        "is_new": {"true": 0, "false": 0},
+        "is_sale": {"true": 0, "false": 0},
+    }
+
+    for row in rows:
+        # grouping() = 0 olan sütun bu sətrin qruplaşdırıldığı ölçüdür
+        grouped = [name for name in dimensions if getattr(row, f"g_{name}") == 0]
+        if not grouped:
+            result["total"] = row.count
+            continue
+
+        name = grouped[0]
+        value = getattr(row, name)
+        if name in ("brands", "categories"):
+            if value is not None:
+                result[name].append({"id": value, "count": row.count})
+        elif name == "price_buckets":
+            if value:
+                result[name].append({**_price_bucket(value), "count": row.count})
+        elif value is not None:
+            result[name]["true" if value else "false"] = row.count
+
+    for name in ("brands", "categories"):
+        result[name].sort(key=lambda item: -item["count"])
+    result["price_buckets"].sort(key=lambda item: item["min"])
+    return result
+
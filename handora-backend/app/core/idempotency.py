@@ -0,0 +1,141 @@
+# ==================== app/core/idempotency.py ====================
+"""
+Idempotency-Key - təkrar göndərilən yazma sorğularının bir dəfə icrası
+
+Key sorğu ilə eyni tranzaksiyada idempotency_keys cədvəlinə yazılır:
+- eyni key ilə paralel sorğu unikal indeksdə birincinin commit/rollback-ını gözləyir;
+- birinci uğurlu olubsa saxlanılmış cavab qaytarılır (handler yenidən işləmir);
+- birinci xəta ilə bitibsə sətir də geri qaytarılır və təkrar sorğu normal icra olunur.
+Tamamlanmış cavablar worker daxilində qısa müddət keşlənir ki, retry-lar bazaya getməsin.
+"""
+import hashlib
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+from fastapi import HTTPException, Response, status
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+PURGE_INTERVAL_SECONDS = 600
+PURGE_BATCH_SIZE = 1000
+
+# (scope, key) -> (fingerprint, status_code, body)
+_hot = TTLCache(maxsize=10000, ttl=600)
+_last_purge = 0.0
+
+
+def fingerprint(*parts) -> str:
+    """Sorğu məzmununun imzası - eyni key fərqli məzmunla təkrar istifadə olunmasın"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _response(status_code: int, body: bytes, replayed: bool = False) -> Response:
+    headers = {REPLAY_HEADER: "true"} if replayed else None
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def _replay(entry: tuple, request_fingerprint: str) -> Response:
+    entry_fingerprint, status_code, body = entry
+    if entry_fingerprint != request_fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_HEADER} başqa məzmunlu sorğu üçün artıq istifadə olunub"
+        )
+    return _response(status_code, body, replayed=True)
+
+
+async def _purge_expired(db: AsyncSession):
+    """Vaxtı keçmiş key-ləri hissə-hissə silir (worker başına ən çox PURGE_INTERVAL_SECONDS-da bir dəfə)"""
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge = now
+
+    expired = select(IdempotencyKey.scope, IdempotencyKey.key)\
+        .where(IdempotencyKey.expires_at < func.now())\
+        .limit(PURGE_BATCH_SIZE)
+    await db.execute(
+        delete(IdempotencyKey).where(
+            tuple_(IdempotencyKey.scope, IdempotencyKey.key).in_(expired)
+        )
+    )
+
+
+async def run_idempotent(
+    db: AsyncSession,
+    key: Optional[str],
+    scope: str,
+    request_fingerprint: str,
+    handler: Callable[[], Awaitable[bytes]],
+    status_code: int = status.HTTP_200_OK
+) -> Response:
+    """
+    handler() yazma işini görür (commit etmədən) və JSON cavabı bytes kimi qaytarır.
+    Commit burada, cavabın özü ilə birlikdə edilir. key verilməyibsə sadəcə icra olunur.
+    """
+    if key is None:
+        body = await handler()
+        await db.commit()
+        return _response(status_code, body)
+
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} 1-{MAX_KEY_LENGTH} simvol olmalıdır"
+        )
+
+    cached = _hot.get((scope, key))
+    if cached is not None:
+        return _replay(cached, request_fingerprint)
+
+    await _purge_expired(db)
+
+    # Vaxtı keçmiş sətir varsa yenidən götürülür, aktiv sətir varsa heç nə dəyişmir
+    expires_at = func.now() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    claim = pg_insert(IdempotencyKey).values(
+        scope=scope, key=key, fingerprint=request_fingerprint, expires_at=expires_at
+    )
+    claim = claim.on_conflict_do_update(
+        index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+        set_={
+            "fingerprint": claim.excluded.fingerprint,
+            "status_code": None,
+            "response_body": None,
+            "created_at": func.now(),
+            "expires_at": claim.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at < func.now()
+    ).returning(IdempotencyKey.key)
+
+    if await db.scalar(claim) is None:
+        row = (await db.execute(
+            select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.response_body)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        )).one()
+        await db.rollback()
+        entry = (row.fingerprint, row.status_code, row.response_body)
+        _hot.set((scope, key), entry)
+        return _replay(entry, request_fingerprint)
+
+    body = await handler()
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .values(status_code=status_code, response_body=body)
+    )
+    await db.commit()
+
+    _hot.set((scope, key), (request_fingerprint, status_code, body))
+    return _response(status_code, body)
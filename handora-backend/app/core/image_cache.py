@@ -0,0 +1,189 @@
+# ==================== app/core/image_cache.py ====================
+"""
+/img resize proxy-sinin disk keşi - bayt limiti ilə LRU
+
+Ölçüsü dəyişdirilmiş şəkil ilk sorğuda anbardakı orijinaldan image_pool-da
+hazırlanır və IMAGE_CACHE_DIR-ə yazılır, sonrakı sorğular fayldan verilir.
+- LRU: istifadə olunan faylın mtime-ı yenilənir (ən çox TOUCH_INTERVAL-da bir dəfə);
+  keş IMAGE_CACHE_MAX_BYTES-ı aşanda ən köhnə mtime-lı fayllar EVICT_RATIO-ya qədər silinir.
+- Eyni anda gələn eyni sorğular birləşdirilir - soyuq populyar şəkil bir dəfə emal olunur,
+  digər sorğular həmin task-ı gözləyir (worker prosesi daxilində).
+Orijinal silinəndə (delete_product_image) onun nüsxələri də keşdən silinir (discard_resized).
+Keş qovluğunu bütün uvicorn worker-ləri bölüşür; hər worker yazdıqlarını sayır və limit
+aşılanda qovluğu yenidən sayıb təmizləyir, ona görə limit təxminidir.
+"""
+import asyncio
+import contextlib
+import glob
+import logging
+import os
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Tuple
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.images import image_pool, resize_image
+from app.core.storage import storage, LocalStorage
+
+logger = logging.getLogger(__name__)
+
+TOUCH_INTERVAL = 60
+EVICT_RATIO = 0.9
+# Yeni yazılmış fayl hələ göndərilir - təmizləmədə silinmir
+MIN_AGE = 10
+TEMP_SUFFIX = ".tmp"
+
+
+class DiskLRUCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.size = None  # ilk yazıda qovluq sayılır
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._evicting = False
+
+    def path(self, name: str) -> str:
+        path = os.path.abspath(os.path.join(self.directory, name))
+        if not path.startswith(self.directory + os.sep):
+            raise ValueError(f"Yanlış keş açarı: {name}")
+        return path
+
+    def _lookup(self, path: str):
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if time.time() - stat_result.st_mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Başqa worker elə indi silib
+                return None
+        return stat_result
+
+    async def get_or_create(self, name: str, create: Callable[[str], Awaitable]) -> Tuple[str, os.stat_result]:
+        """
+        Keşdəki faylın yolu və stat-ı; yoxdursa create(müvəqqəti yol) faylı hazırlayır.
+        Sorğu kəsilsə də emal davam edir və nəticə keşə düşür.
+        """
+        path = self.path(name)
+        stat_result = await asyncio.to_thread(self._lookup, path)
+        if stat_result is not None:
+            return path, stat_result
+
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._create(path, create))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return path, await asyncio.shield(task)
+
+    async def _create(self, path: str, create: Callable[[str], Awaitable]) -> os.stat_result:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}{TEMP_SUFFIX}"
+        try:
+            await create(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        stat_result = os.stat(path)
+        await self._account(stat_result.st_size)
+        return stat_result
+
+    def _scan(self) -> list:
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat_result = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                # Yazılmaqda olan fayllar sayılmır (qəzadan qalanlar bir saatdan sonra silinir)
+                if name.endswith(TEMP_SUFFIX) and time.time() - stat_result.st_mtime < 3600:
+                    continue
+                files.append((stat_result.st_mtime, stat_result.st_size, path))
+        return files
+
+    def _evict(self) -> int:
+        """Ən köhnə fayllar max_bytes * EVICT_RATIO-ya qədər silinir, qalan ölçü qaytarılır"""
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return total
+        removed = 0
+        now = time.time()
+        for mtime, size, path in sorted(files):
+            if total <= self.max_bytes * EVICT_RATIO or now - mtime < MIN_AGE:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        logger.info("Şəkil keşindən %s fayl silindi, qalan %s bayt", removed, total)
+        return total
+
+    async def _account(self, size: int):
+        if self.size is None:
+            self.size = sum(size for _, size, _ in await asyncio.to_thread(self._scan))
+        else:
+            self.size += size
+        if self.size > self.max_bytes and not self._evicting:
+            self._evicting = True
+            try:
+                self.size = await asyncio.to_thread(self._evict)
+            finally:
+                self._evicting = False
+
+
+resize_cache = DiskLRUCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
+
+
+async def discard_resized(key: str):
+    """Şəklin (orijinal və {stem}_* variantları) bütün ölçülərdəki nüsxələrini keşdən silir"""
+    stem = os.path.splitext(key)[0]
+    
+    def remove():
+        for size in settings.IMAGE_RESIZE_SIZES:
+            base = glob.escape(resize_cache.path(f"{size}/{stem}"))
+            for path in glob.glob(f"{base}.*") + glob.glob(f"{base}_*"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+    
+    await asyncio.to_thread(remove)
+
+
+async def resize_original(key: str, width: int, height: int, target: str):
+    """Anbardakı orijinaldan (S3-də əvvəlcə müvəqqəti fayla endirilir) kiçildilmiş nüsxə"""
+    if isinstance(storage, LocalStorage):
+        source = storage.path(key)
+        if not os.path.isfile(source):
+            raise HTTPException(status_code=404, detail="Şəkil tapılmadı")
+        await image_pool.run(resize_image, source, target, width, height)
+        # Emal zamanı orijinal silinibsə nüsxə keşə düşməməlidir (discard_resized artıq işləyib)
+        if not os.path.isfile(source):
+            raise HTTPException(status_code=404, detail="Şəkil tapılmadı")
+        return
+
+    fd, source = tempfile.mkstemp(suffix=".source")
+    os.close(fd)
+    try:
+        try:
+            await storage.download(key, source)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Şəkil tapılmadı")
+        await image_pool.run(resize_image, source, target, width, height)
+    finally:
+        os.remove(source)
+
+
+async def resized_image(key: str, size: str) -> Tuple[str, os.stat_result]:
+    width, height = (int(part) for part in size.split("x"))
+    return await resize_cache.get_or_create(
+        f"{size}/{key}", lambda target: resize_original(key, width, height, target)
+    )
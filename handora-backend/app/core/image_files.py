@@ -0,0 +1,90 @@
+# ==================== app/core/image_files.py ====================
+"""
+Lokal anbardakı şəkillərin verilməsi (/uploads) - StaticFiles üzərində
+
+- Hash ilə adlandırılmış fayllar (<sha256>.jpg, <sha256>_400.webp) heç vaxt
+  dəyişmir: Cache-Control immutable (1 il) və məzmundan alınan ETag göndərilir,
+  brauzer/CDN onları yenidən yoxlamır. Köhnə (uuid) fayllar qısa müddət keşlənir.
+- If-None-Match / If-Modified-Since -> 304 və Range sorğuları StaticFiles/FileResponse-dadır;
+  hash-li faylın ETag-i tanışdırsa 304 diskə (stat) müraciət etmədən qaytarılır.
+- Fayl bir-iki böyük hissə ilə göndərilir (64KB əvəzinə) - hər hissə ayrıca thread keçididir.
+- Server ASGI pathsend-i dəstəkləyirsə (Granian, Hypercorn) fayl zero-copy göndərilir.
+  Uvicorn önündə nginx olduqda IMAGE_ACCEL_REDIRECT_PREFIX ilə faylı nginx özü
+  sendfile ilə verir (X-Accel-Redirect), app yalnız başlıqları qaytarır.
+"""
+import os
+from email.utils import parsedate
+from typing import Optional
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from app.core.config import settings
+from app.core.image_store import digest_of
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LEGACY_CACHE_CONTROL = "public, max-age=86400"
+
+
+def content_tag(path: str):
+    """Hash-li faylın ETag-i (fayl adının kökü), köhnə fayllar üçün None"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem if digest_of(stem.split("_", 1)[0]) else None
+
+
+class ImageFileResponse(FileResponse):
+    # Şəkillərin əksəriyyəti bir hissəyə sığır
+    chunk_size = 1024 * 1024
+
+
+def is_not_modified(response_headers: Headers, request_headers: Headers) -> bool:
+    """StaticFiles.is_not_modified ilə eyni qaydalar (If-None-Match üstündür)"""
+    if if_none_match := request_headers.get("if-none-match"):
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or response_headers["etag"] in tags
+
+    if_modified_since = parsedate(request_headers.get("if-modified-since", ""))
+    last_modified = parsedate(response_headers.get("last-modified", ""))
+    return if_modified_since is not None and last_modified is not None and if_modified_since >= last_modified
+
+
+def image_file_response(path: str, stat_result: os.stat_result, request_headers: Headers,
+                        tag: Optional[str] = None, accel_path: Optional[str] = None) -> Response:
+    """
+    Şəkil faylının cavabı: tag verilibsə (dəyişməz məzmun) immutable keş və həmin ETag,
+    yoxdursa mtime/size ETag-i və qısa keş. 304 burada, Range FileResponse-da həll olunur.
+    accel_path - nginx-in internal location-u altında faylın yolu (IMAGE_ACCEL_REDIRECT_PREFIX).
+    """
+    headers = {"cache-control": IMMUTABLE_CACHE_CONTROL if tag else LEGACY_CACHE_CONTROL}
+    if tag:
+        headers["etag"] = f'"{tag}"'
+
+    if accel_path:
+        # nginx faylı özü verir (sendfile, Range, 304); Cache-Control bu cavabdan saxlanılır
+        response = Response(headers=headers)
+        response.headers["x-accel-redirect"] = accel_path
+        del response.headers["content-length"]
+        return response
+
+    response = ImageFileResponse(path, headers=headers, stat_result=stat_result)
+    if is_not_modified(response.headers, request_headers):
+        return NotModifiedResponse(response.headers)
+    return response
+
+
+class ImageFiles(StaticFiles):
+    async def get_response(self, path: str, scope) -> Response:
+        # Hash-li faylın məzmunu adından bəllidir - tanış ETag üçün diskə baxmadan 304
+        tag = content_tag(path)
+        if tag and scope["method"] in ("GET", "HEAD"):
+            headers = Headers(raw=[(b"etag", f'"{tag}"'.encode())])
+            if is_not_modified(headers, Headers(scope=scope)):
+                return NotModifiedResponse(Headers({"cache-control": IMMUTABLE_CACHE_CONTROL, "etag": f'"{tag}"'}))
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        accel_path = None
+        if settings.IMAGE_ACCEL_REDIRECT_PREFIX:
+            relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+            accel_path = f"{settings.IMAGE_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{relative}"
+        return image_file_response(full_path, stat_result, Headers(scope=scope), content_tag(full_path), accel_path)
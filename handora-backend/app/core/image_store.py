@@ -0,0 +1,148 @@
+# ==================== app/core/image_store.py ====================
+"""
+Məzmun ünvanlı (content-addressed) şəkil anbarı - image_blobs cədvəli ilə
+
+Fayl adı yüklənmənin sha256-sıdır, ona görə eyni foto bir dəfə saxlanılır və
+bir dəfə emal olunur. Hər istifadə refcount-u artırır (acquire_images), məhsul
+şəkli dəyişdikdə/silindikdə azaldır (release_images). Fayllar tranzaksiya ilə
+uyğunlaşdırılır:
+- refcount 0-a düşən şəkillər yalnız commit-dən sonra silinir;
+- bu tranzaksiyada yeni yazılmış şəkillər rollback olduqda silinir.
+Eyni hash-i paralel yükləyən ikinci sorğu birincinin sətrini (unikal açar) gözləyir
+və onun manifestini alır - şəkil iki dəfə emal olunmur.
+
+Fayl açarları digest-dən asılıdır, ona görə silmə ilə yenidən yükləmə eyni faylları
+hədəfləyə bilər. Hər ikisi digest üzrə advisory lock götürür: yükləyən onu
+tranzaksiyanın sonuna qədər saxlayır, fon silməsi isə kilidi alıb image_blobs-da
+sətir olmadığını yoxladıqdan sonra silir - təzə yazılmış fayllar silinmir.
+"""
+import asyncio
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, String, column, delete, event, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import AsyncSessionLocal
+from app.models.image import ImageBlob
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+def digest_of(url: str) -> Optional[str]:
+    """Hash ilə adlandırılmış şəklin digest-i; köhnə (uuid) fayllar üçün None"""
+    stem = os.path.splitext(url.rsplit("/", 1)[-1])[0]
+    return stem if _DIGEST.match(stem) else None
+
+
+def _digest_lock(digest: str):
+    return select(func.pg_advisory_xact_lock(func.hashtextextended(digest, 0)))
+
+
+async def acquire_images(db: AsyncSession, counts: Dict[str, int]) -> Dict[str, Optional[dict]]:
+    """
+    Hər digest-in refcount-unu artırır (sətir yoxdursa yaradır).
+    Mövcud şəkil üçün manifest, yenisi üçün None qaytarılır - onu çağıran emal etməlidir.
+    Digest-lər sıra ilə kilidlənir ki, eyni şəkilləri yükləyən sorğular deadlock olmasın.
+    """
+    manifests = {}
+    for digest in sorted(counts):
+        await db.execute(_digest_lock(digest))
+        stmt = pg_insert(ImageBlob).values(digest=digest, refcount=counts[digest])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ImageBlob.digest],
+            set_={"refcount": ImageBlob.refcount + stmt.excluded.refcount}
+        ).returning(ImageBlob.manifest)
+        manifests[digest] = await db.scalar(stmt)
+    return manifests
+
+
+def track_new_image(db: AsyncSession, url: str):
+    """Bu tranzaksiyada yazılmış şəkil - rollback olsa faylları silinəcək"""
+    db.info.setdefault("new_images", []).append(url)
+
+
+async def store_manifests(db: AsyncSession, manifests: Dict[str, dict]):
+    if manifests:
+        await db.execute(update(ImageBlob), [
+            {"digest": digest, "manifest": manifest} for digest, manifest in manifests.items()
+        ])
+
+
+async def release_images(db: AsyncSession, urls: List[str]):
+    """
+    Şəkillərin refcount-unu azaldır; 0-a düşənlərin sətri silinir, faylları commit-dən sonra.
+    Köhnə (hash-siz) fayllar birbaşa commit-dən sonra silinir.
+    """
+    released = db.info.setdefault("released_images", [])
+    counts = Counter()
+    for url in urls:
+        digest = digest_of(url)
+        if digest is None:
+            released.append(url)
+        else:
+            counts[digest] += 1
+    if not counts:
+        return
+
+    changes = values(column("digest", String), column("count", Integer), name="changes").data(sorted(counts.items()))
+    await db.execute(
+        update(ImageBlob)
+        .where(ImageBlob.digest == changes.c.digest)
+        .values(refcount=ImageBlob.refcount - changes.c.count)
+        .execution_options(synchronize_session=False)
+    )
+    unused = await db.scalars(
+        delete(ImageBlob)
+        .where(ImageBlob.digest.in_(counts), ImageBlob.refcount <= 0)
+        .returning(ImageBlob.manifest)
+    )
+    released.extend(manifest["url"] for manifest in unused if manifest)
+
+
+# Fon silmə task-ları (GC tərəfindən yarımçıq atılmasın deyə istinad saxlanılır)
+_delete_tasks = set()
+
+
+async def _delete_if_unused(url: str):
+    from app.core.utils import delete_product_image
+    
+    digest = digest_of(url)
+    if digest is None:
+        await delete_product_image(url)
+        return
+    
+    async with AsyncSessionLocal() as db:
+        # Eyni digest-i yükləyən tranzaksiya bitənə qədər gözlənilir; sonra sətir varsa fayllar onundur
+        await db.execute(_digest_lock(digest))
+        if await db.scalar(select(ImageBlob.digest).where(ImageBlob.digest == digest)) is None:
+            await delete_product_image(url)
+        await db.commit()
+
+
+def _delete_images(urls: list):
+    """Anbardan silmə async-dir - commit/rollback hook-u sync olduğu üçün fon task-ı kimi"""
+    if not urls:
+        return
+    
+    async def delete_all():
+        await asyncio.gather(*[_delete_if_unused(url) for url in urls])
+    
+    task = asyncio.get_running_loop().create_task(delete_all())
+    _delete_tasks.add(task)
+    task.add_done_callback(_delete_tasks.discard)
+
+
+# AsyncSession commit/rollback-u da daxili sync Session üzərindən keçir
+@event.listens_for(Session, "after_commit")
+def _delete_released_images(session):
+    session.info.pop("new_images", None)
+    _delete_images(session.info.pop("released_images", []))
+
+
+@event.listens_for(Session, "after_rollback")
+def _delete_new_images(session):
+    session.info.pop("released_images", None)
+    _delete_images(session.info.pop("new_images", []))
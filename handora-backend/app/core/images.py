@@ -0,0 +1,112 @@
+# ==================== app/core/images.py ====================
+"""
+Şəkil emalı (Pillow) - ayrıca, ölçüsü məhdud process pool-da
+
+Decode, resize və encode bir 5MB şəkil üçün yüzlərlə ms CPU tutur. Event loop-da
+işləsə həmin müddətdə worker-in bütün sorğuları gözləyir. Buna görə emal
+IMAGE_WORKERS prosesdə icra olunur, növbə IMAGE_MAX_PENDING ilə məhduddur.
+
+Hər şəkil üçün IMAGE_VARIANT_WIDTHS enlərində WebP (IMAGE_AVIF=true olduqda
+AVIF də) variantlar yaradılır; nəticə məhsulun image_variants manifestinə yazılır.
+
+Modul yüngül saxlanılır (Pillow, config və pool) ki, pool prosesləri tez başlasın.
+"""
+import os
+from typing import List
+from PIL import Image, features
+from app.core.config import settings
+from app.core.process_pool import BoundedProcessPool
+
+MAX_IMAGE_SIZE = (1200, 1200)
+VARIANT_QUALITY = {"webp": 80, "avif": 60}
+
+
+def variant_formats() -> List[str]:
+    """Yaradılacaq əlavə formatlar - AVIF yalnız aktivdirsə və Pillow dəstəkləyirsə"""
+    formats = ["webp"]
+    if settings.IMAGE_AVIF and features.check("avif"):
+        formats.append("avif")
+    return formats
+
+
+def _save_variants(img: Image.Image, directory: str, stem: str, widths: List[int], formats: List[str]) -> dict:
+    """Hər en və format üçün {stem}_{en}.{format} faylı yazır (böyütmə olmur)"""
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGB")
+    
+    sizes = sorted({width for width in widths if width < img.width} | {img.width})
+    variants = {image_format: [] for image_format in formats}
+    for width in sizes:
+        height = max(1, round(img.height * width / img.width))
+        resized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+        for image_format in formats:
+            filename = f"{stem}_{width}.{image_format}"
+            resized.save(os.path.join(directory, filename), quality=VARIANT_QUALITY[image_format])
+            variants[image_format].append({"file": filename, "width": width, "height": height})
+    return variants
+
+
+def process_image(source: str, directory: str, filename: str, widths: List[int], formats: List[str]) -> dict:
+    """
+    Şəkli MAX_IMAGE_SIZE-a kiçildib optimallaşdırılmış halda yazır və responsive
+    variantları yaradır (pool prosesində). Manifest qaytarır: orijinalın ölçüləri
+    və format -> [{file, width, height}] variantları.
+    """
+    img = Image.open(source)
+    
+    # JPEG-i decode zamanı kiçildir (DCT scaling) - böyük fotolarda decode bir neçə dəfə sürətlənir
+    img.draft("RGB", MAX_IMAGE_SIZE)
+    
+    # Resize if too large
+    img.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+    
+    # Convert RGBA to RGB if necessary (variantlar alfa kanalını saxlayır - WebP/AVIF dəstəkləyir)
+    original = img.convert('RGB') if img.mode == 'RGBA' else img
+    
+    # Save optimized
+    original.save(os.path.join(directory, filename), optimize=True, quality=85)
+    
+    stem = os.path.splitext(filename)[0]
+    return {
+        "file": filename,
+        "width": img.width,
+        "height": img.height,
+        "variants": _save_variants(img, directory, stem, widths, formats)
+    }
+
+
+def add_variants(directory: str, filename: str, widths: List[int], formats: List[str]) -> dict:
+    """Artıq saxlanmış şəkil üçün yalnız variantları yaradır (orijinal yenidən encode olunmur)"""
+    with Image.open(os.path.join(directory, filename)) as img:
+        img.load()
+        return {
+            "file": filename,
+            "width": img.width,
+            "height": img.height,
+            "variants": _save_variants(img, directory, os.path.splitext(filename)[0], widths, formats)
+        }
+
+
+def resize_image(source: str, target: str, width: int, height: int) -> dict:
+    """
+    Şəkli width x height qutusuna sığacaq qədər kiçildir (nisbət saxlanılır, böyütmə olmur)
+    və target-ə orijinalın formatında yazır - /img resize proxy-si üçün (pool prosesində)
+    """
+    with Image.open(source) as img:
+        image_format = img.format
+        img.draft("RGB", (width, height))
+        img.thumbnail((width, height), Image.Resampling.LANCZOS)
+        if image_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(target, format=image_format, optimize=True, quality=85)
+        return {"width": img.width, "height": img.height}
+
+
+image_pool = BoundedProcessPool(settings.IMAGE_WORKERS, settings.IMAGE_MAX_PENDING)
+
+
+async def process_image_async(source: str, directory: str, filename: str) -> dict:
+    """source - yüklənmənin müvəqqəti faylı (bytes proseslər arasında ötürülmür)"""
+    return await image_pool.run(
+        process_image, source, directory, filename, settings.IMAGE_VARIANT_WIDTHS, variant_formats()
+    )
@@ -0,0 +1,282 @@
+# ==================== app/core/inventory.py ====================
+"""
+Stok - sharded sayğaclar və müvəqqəti rezervasiyalar
+
+Adi məhsulun stoku products.stock-dadır və sifariş sətri kilidləyir.
+Flash sale məhsulları üçün stok N inventory_shards sətrinə bölünür
+(set_product_shards): hər checkout təsadüfi, kilidlənməmiş bir shard-dan
+götürür, buna görə eyni məhsula paralel sifarişlərin sayı shard sayı ilə artır.
+Belə məhsullarda products.stock shard-ların cəminin surətidir və
+reconciler tərəfindən yenilənir.
+
+Rezervasiya stoku qabaqcadan (səbət/checkout) ayırır; sifariş onu istifadə edir,
+vaxtı bitən rezervasiyaları isə reconciler stoka qaytarır.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, column, delete, func, insert, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.response_cache import bump_versions
+from app.database import AsyncSessionLocal
+from app.models.inventory import InventoryShard, InventoryReservation
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+MAX_SHARDS = 64
+RECONCILE_BATCH_SIZE = 500
+# pg_try_advisory_xact_lock açarı - reconciler dövrünü bir anda yalnız bir worker icra edir
+RECONCILER_LOCK_ID = 0x68616E64  # "hand"
+
+
+def _out_of_stock(name: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{name} stokda yoxdur")
+
+
+async def _take_spanning(db: AsyncSession, product_id: int, quantity: int) -> Optional[int]:
+    """Miqdar heç bir shard-a sığmayanda bir neçə shard-dan götürür (shard sırası ilə kilidləyir)"""
+    rows = (await db.execute(
+        select(InventoryShard.shard, InventoryShard.available)
+        .where(InventoryShard.product_id == product_id, InventoryShard.available > 0)
+        .order_by(InventoryShard.shard)
+        .with_for_update()
+    )).all()
+    if sum(row.available for row in rows) < quantity:
+        return None
+
+    parts, remaining = [], quantity
+    for row in rows:
+        part = min(row.available, remaining)
+        parts.append((row.shard, part))
+        remaining -= part
+        if remaining == 0:
+            break
+
+    changes = values(column("shard", Integer), column("quantity", Integer), name="changes").data(parts)
+    await db.execute(
+        update(InventoryShard)
+        .where(InventoryShard.product_id == product_id, InventoryShard.shard == changes.c.shard)
+        .values(available=InventoryShard.available - changes.c.quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return parts[0][0]
+
+
+async def take_from_shards(db: AsyncSession, product_id: int, quantity: int) -> Optional[int]:
+    """
+    Sharded məhsuldan stok götürür, istifadə olunan shard-ı qaytarır (stok yoxdursa None).
+    Əvvəlcə kilidlənməmiş təsadüfi shard (SKIP LOCKED), sonra gözləməklə, sonda bir neçə shard.
+    """
+    for skip_locked in (True, False):
+        candidate = select(InventoryShard.shard)\
+            .where(InventoryShard.product_id == product_id, InventoryShard.available >= quantity)\
+            .order_by(func.random())\
+            .limit(1)\
+            .with_for_update(skip_locked=skip_locked)
+        shard = await db.scalar(
+            update(InventoryShard)
+            .where(InventoryShard.product_id == product_id, InventoryShard.shard == candidate.scalar_subquery())
+            .values(available=InventoryShard.available - quantity)
+            .returning(InventoryShard.shard)
+            .execution_options(synchronize_session=False)
+        )
+        if shard is not None:
+            return shard
+
+    return await _take_spanning(db, product_id, quantity)
+
+
+async def take_stock(db: AsyncSession, product_id: int, quantity: int) -> Optional[int]:
+    """
+    Məhsuldan stok götürür (rezervasiya üçün).
+    Adi məhsulda None, sharded məhsulda istifadə olunan shard qaytarılır; stok yoxdursa 400.
+    """
+    taken = await db.scalar(
+        update(Product)
+        .where(Product.id == product_id, Product.stock_shards == 0, Product.stock >= quantity)
+        .values(stock=Product.stock - quantity)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    if taken is not None:
+        return None
+
+    product = (await db.execute(
+        select(Product.name_az, Product.stock_shards).where(Product.id == product_id)
+    )).first()
+    if product is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Məhsul ID {product_id} tapılmadı")
+    if not product.stock_shards:
+        raise _out_of_stock(product.name_az)
+
+    shard = await take_from_shards(db, product_id, quantity)
+    if shard is None:
+        raise _out_of_stock(product.name_az)
+    return shard
+
+
+async def give_back(db: AsyncSession, product_id: int, shard: Optional[int], quantity: int):
+    """Stoku geri qaytarır - məhsul o vaxtdan bəri (un)shard olunubsa cari vəziyyətə uyğun"""
+    shards = await db.scalar(select(Product.stock_shards).where(Product.id == product_id))
+    if shards is None:
+        return
+
+    if shards == 0:
+        await db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(stock=Product.stock + quantity)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        await db.execute(
+            update(InventoryShard)
+            .where(InventoryShard.product_id == product_id, InventoryShard.shard == (shard or 0) % shards)
+            .values(available=InventoryShard.available + quantity)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def set_product_shards(db: AsyncSession, product_id: int, shards: int, total: Optional[int] = None) -> Product:
+    """
+    Məhsulun stokunu shards sətrə bərabər bölür (0 - shard-lar products.stock-a birləşdirilir).
+    total verilməyibsə cari stok saxlanılır.
+    """
+    product = await db.scalar(select(Product).where(Product.id == product_id).with_for_update())
+    if product is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Məhsul tapılmadı")
+
+    current = (await db.scalars(
+        select(InventoryShard.available).where(InventoryShard.product_id == product_id).with_for_update()
+    )).all()
+    if total is None:
+        total = sum(current) if product.stock_shards else product.stock
+
+    await db.execute(delete(InventoryShard).where(InventoryShard.product_id == product_id))
+    if shards > 0:
+        base, extra = divmod(total, shards)
+        await db.execute(insert(InventoryShard), [
+            {"product_id": product_id, "shard": i, "available": base + (1 if i < extra else 0)}
+            for i in range(shards)
+        ])
+
+    product.stock = total
+    product.stock_shards = shards
+    await bump_versions(db, f"product:{product_id}")
+    return product
+
+
+async def reserve(db: AsyncSession, user_id: int, product_id: int, quantity: int) -> InventoryReservation:
+    shard = await take_stock(db, product_id, quantity)
+    reservation = InventoryReservation(
+        user_id=user_id,
+        product_id=product_id,
+        quantity=quantity,
+        shard=shard,
+        expires_at=func.now() + timedelta(seconds=settings.RESERVATION_TTL_SECONDS)
+    )
+    db.add(reservation)
+    await db.flush()
+    await db.refresh(reservation, ["expires_at", "created_at"])
+    return reservation
+
+
+async def release_reservation(db: AsyncSession, reservation: InventoryReservation):
+    await give_back(db, reservation.product_id, reservation.shard, reservation.quantity)
+    await db.delete(reservation)
+
+
+async def consume_reservations(db: AsyncSession, user_id: int, items: List):
+    """
+    Sifariş sətirlərinin rezervasiyalarını istifadə edir (stok artıq ayrılıb).
+    Sətrin məhsulu və miqdarı rezervasiya ilə eyni olmalıdır.
+    """
+    ids = [item.reservation_id for item in items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Rezervasiya bir dəfə istifadə oluna bilər")
+
+    rows = await db.execute(
+        select(InventoryReservation.id, InventoryReservation.product_id, InventoryReservation.quantity)
+        .where(
+            InventoryReservation.id.in_(ids),
+            InventoryReservation.user_id == user_id,
+            InventoryReservation.expires_at > func.now()
+        )
+        .order_by(InventoryReservation.id)
+        .with_for_update()
+    )
+    reservations = {row.id: row for row in rows}
+
+    for item in items:
+        reservation = reservations.get(item.reservation_id)
+        if reservation is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Rezervasiya {item.reservation_id} tapılmadı və ya vaxtı bitib"
+            )
+        if reservation.product_id != item.product_id or reservation.quantity != item.quantity:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Rezervasiya {item.reservation_id} sifariş sətrinə uyğun deyil"
+            )
+
+    await db.execute(delete(InventoryReservation).where(InventoryReservation.id.in_(ids)))
+
+
+async def reconcile(db: AsyncSession) -> dict:
+    """
+    Vaxtı bitmiş rezervasiyaları stoka qaytarır və sharded məhsulların
+    products.stock dəyərini shard-ların cəminə bərabərləşdirir.
+    """
+    expired = select(InventoryReservation.id)\
+        .where(InventoryReservation.expires_at < func.now())\
+        .order_by(InventoryReservation.id)\
+        .limit(RECONCILE_BATCH_SIZE)\
+        .with_for_update(skip_locked=True)
+    released = (await db.execute(
+        delete(InventoryReservation)
+        .where(InventoryReservation.id.in_(expired.scalar_subquery()))
+        .returning(InventoryReservation.product_id, InventoryReservation.shard, InventoryReservation.quantity)
+    )).all()
+
+    returned = defaultdict(int)
+    for row in released:
+        returned[(row.product_id, row.shard)] += row.quantity
+    for (product_id, shard), quantity in sorted(returned.items(), key=lambda entry: (entry[0][0], entry[0][1] or 0)):
+        await give_back(db, product_id, shard, quantity)
+
+    totals = select(
+        InventoryShard.product_id,
+        func.sum(InventoryShard.available).label("total")
+    ).group_by(InventoryShard.product_id).subquery()
+    synced = (await db.scalars(
+        update(Product)
+        .where(Product.id == totals.c.product_id, Product.stock_shards > 0, Product.stock != totals.c.total)
+        .values(stock=totals.c.total)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+    changed = {product_id for product_id, _ in returned} | set(synced)
+    await bump_versions(db, *[f"product:{product_id}" for product_id in changed])
+    return {"released": len(released), "synced": len(synced)}
+
+
+async def run_reconciler():
+    """App işlədikcə hər INVENTORY_RECONCILE_SECONDS-da bir reconcile edir"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                if await db.scalar(select(func.pg_try_advisory_xact_lock(RECONCILER_LOCK_ID))):
+                    await reconcile(db)
+                await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Inventory reconcile alınmadı")
+        await asyncio.sleep(settings.INVENTORY_RECONCILE_SECONDS)
@@ -0,0 +1,45 @@
+# ==================== app/core/middleware.py ====================
+"""
+Multipart yükləmələrin ölçü limiti - form parse edilməzdən əvvəl
+
+Starlette faylı endpoint-ə çatmazdan əvvəl tam oxuyub müvəqqəti fayla yazır,
+ona görə limit endpoint-də yoxlansa böyük sorğu yenə bütünlüklə qəbul edilmiş olur.
+Bu middleware Content-Length limiti aşırsa sorğunu dərhal 413 ilə rədd edir,
+uzunluq bilinmirsə (chunked) qəbul olunan baytları sayıb limitdə dayandırır.
+"""
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+
+
+class UploadSizeLimitMiddleware:
+    def __init__(self, app, max_size: int):
+        self.app = app
+        self.max_size = max_size
+        self.detail = f"Sorğu çox böyükdür (maksimum {max_size // (1024 * 1024)}MB)"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_size:
+            response = JSONResponse(status_code=status.HTTP_413_CONTENT_TOO_LARGE, content={"detail": self.detail})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # Form parse zamanı qaldırılır, FastAPI onu olduğu kimi 413 cavabına çevirir
+                    raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
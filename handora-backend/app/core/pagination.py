@@ -0,0 +1,107 @@
+# ==================== app/core/pagination.py ====================
+"""
+Keyset (cursor) pagination
+
+Cursor - sıralama açarı və id dəyərlərinin base64 ilə kodlanmış halıdır.
+OFFSET əvəzinə WHERE (key, id) > (:key, :id) istifadə olunur, buna görə
+500-cü səhifə də 1-ci qədər ucuzdur və admin dəyişiklikləri səhifələri sürüşdürmür.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.product import Product, Category, Brand
+from app.models.order import Order
+
+
+class SortSpec(NamedTuple):
+    name: str
+    columns: list  # sonuncu sütun unikal olmalıdır (id)
+    descending: bool
+
+
+def _sorts(*specs: SortSpec) -> dict:
+    return {spec.name: spec for spec in specs}
+
+
+# Hər sıralama üçün uyğun composite indeks modeldə təyin olunub
+PRODUCT_SORTS = _sorts(
+    SortSpec("newest", [Product.created_at, Product.id], True),
+    SortSpec("price_asc", [Product.price, Product.id], False),
+    SortSpec("price_desc", [Product.price, Product.id], True),
+    SortSpec("id", [Product.id], False),
+)
+PRODUCT_SORT_PATTERN = f"^({'|'.join(PRODUCT_SORTS)})$"
+
+ORDER_SORTS = _sorts(
+    SortSpec("newest", [Order.created_at, Order.id], True),
+    SortSpec("id", [Order.id], False),
+)
+ORDER_SORT_PATTERN = f"^({'|'.join(ORDER_SORTS)})$"
+
+CATEGORY_SORT = SortSpec("id", [Category.id], False)
+BRAND_SORT = SortSpec("newest", [Brand.created_at, Brand.id], True)
+
+
+def _invalid_cursor():
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor yanlışdır")
+
+
+def encode_cursor(sort: SortSpec, values: list) -> str:
+    payload = [sort.name] + [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort: SortSpec, cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise _invalid_cursor()
+
+    # Başqa sıralama üçün verilmiş cursor qəbul edilmir
+    if not isinstance(payload, list) or len(payload) != len(sort.columns) + 1 or payload[0] != sort.name:
+        raise _invalid_cursor()
+
+    values = []
+    for column, value in zip(sort.columns, payload[1:]):
+        try:
+            if isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise _invalid_cursor()
+        values.append(value)
+    return values
+
+
+async def paginate(db: AsyncSession, stmt, sort: SortSpec, cursor: Optional[str], limit: int):
+    """
+    select() statement-i keyset ilə səhifələyir.
+    (items, next_cursor) qaytarır - son səhifədə next_cursor None olur.
+    """
+    columns = sort.columns
+
+    if cursor:
+        values = decode_cursor(sort, cursor)
+        if len(columns) == 1:
+            key, value = columns[0], values[0]
+        else:
+            key, value = tuple_(*columns), tuple_(*values)
+        stmt = stmt.where(key < value if sort.descending else key > value)
+
+    order_by = [column.desc() if sort.descending else column.asc() for column in columns]
+    result = await db.scalars(stmt.order_by(*order_by).limit(limit + 1))
+    items: List = list(result.all())
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, column.key) for column in columns])
+
+    return items, next_cursor
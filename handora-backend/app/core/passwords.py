@@ -0,0 +1,36 @@
+# ==================== app/core/passwords.py ====================
+"""
+Şifrə hash-ləmə (Argon2) - ayrıca, ölçüsü məhdud process pool-da
+
+Argon2 CPU-nu bilərəkdən uzun tutur. Event loop və ya ümumi threadpool-da
+işləsə login axını katalog sorğularını gecikdirir. Buna görə hash/verify
+PASSWORD_WORKERS prosesdə icra olunur. Növbədə PASSWORD_MAX_PENDING-dən çox iş
+varsa sorğu gözlədilmir, dərhal 503 qaytarılır.
+
+Modul yüngül saxlanılır (yalnız passlib, config və pool) ki, pool prosesləri tez başlasın.
+"""
+from passlib.context import CryptContext
+from app.core.config import settings
+from app.core.process_pool import BoundedProcessPool
+
+# 1) Argon2 istifadə edirik
+pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+password_pool = BoundedProcessPool(settings.PASSWORD_WORKERS, settings.PASSWORD_MAX_PENDING)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, password, hashed_password)
@@ -0,0 +1,55 @@
+# ==================== app/core/process_pool.py ====================
+"""
+Ölçüsü məhdud process pool - CPU-ağır işlər (Argon2, şəkil emalı) event loop-dan kənarda
+
+Hər uvicorn worker-i öz pool-unu saxlayır. Növbədə max_pending-dən çox iş varsa
+sorğu gözlədilmir, dərhal 503 qaytarılır.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException, status
+
+
+class BoundedProcessPool:
+    """Process pool + növbə limiti (bir worker-in event loop-u daxilində işlədilir)"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Lazy yaradılır; fork əvəzinə spawn - ana prosesdə thread-lər və açıq qoşulmalar var
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server hazırda məşğuldur, bir az sonra yenidən cəhd edin",
+                headers={"Retry-After": "1"}
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            # Proses qəfil öldü (məs. OOM) - növbəti iş yeni pool ilə başlasın
+            self._executor = None
+            raise
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
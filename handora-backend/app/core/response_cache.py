@@ -0,0 +1,181 @@
+# ==================== app/core/response_cache.py ====================
+"""
+Versiyalı response keşi (ETag / 304)
+
+Admin yazma əməliyyatları entity versiyasını artırır (bump_versions).
+Oxuma endpointləri cavabı (path, query, versiyalar) açarı ilə proses daxili
+LRU-da saxlayır; ETag da eyni açardan hesablanır, buna görə If-None-Match
+uyğun gələndə 304 bazaya toxunmadan qaytarılır.
+
+Versiyalar entity_versions cədvəlində saxlanılır ki, bütün worker-lər görsün;
+hər worker sorğunun entity-lərinin versiyalarını ən çox VERSION_REFRESH_SECONDS-da
+bir dəfə PK ilə yenidən oxuyur; surət VERSION_CACHE_MAXSIZE entity ilə məhduddur.
+Sequence dəyəri commit sırasını göstərmir (kiçik dəyər böyükdən sonra commit oluna
+bilər), ona görə "son görülən versiya"-dan sonrakıları oxumaq dəyişiklikləri itirə bilərdi.
+Versiyalar həmişə primary-dən oxunur; cavab replica-dan qurulanda replica-nın
+həmin versiyalara çatdığı yoxlanılır.
+"""
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import AsyncSessionLocal, is_replica_session
+from app.core.config import settings
+from app.models.cache import EntityVersion, entity_version_seq
+from app.core.cache import SizedLRUCache, TTLCache
+
+VERSION_REFRESH_SECONDS = 1.0
+VERSION_CACHE_MAXSIZE = 10000
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class EntityVersions:
+    """
+    Entity versiyalarının worker daxilindəki surəti - ölçüsü məhdud TTL keş.
+    Vaxtı keçmiş və ya keşdən çıxmış entity növbəti müraciətdə bazadan yenidən oxunur.
+    """
+
+    def __init__(self, refresh_interval: float = VERSION_REFRESH_SECONDS, maxsize: int = VERSION_CACHE_MAXSIZE):
+        self._versions = TTLCache(maxsize=maxsize, ttl=refresh_interval)
+        self._lock = threading.Lock()
+
+    async def _refresh(self, entities: list):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(EntityVersion.entity, EntityVersion.version)
+                .where(EntityVersion.entity.in_(entities))
+            )
+            versions = {row.entity: row.version for row in result}
+        # Bazada sətri olmayan entity-nin versiyası 0-dır
+        self.apply({entity: versions.get(entity, 0) for entity in entities})
+
+    def apply(self, versions: dict):
+        # Bir sətrin versiyası yalnız artır (upsert sətri kilidləyir), köhnə oxunuş yenisini əvəzləmir
+        with self._lock:
+            for entity, version in versions.items():
+                self._versions.set(entity, max(version, self._versions.get(entity, 0)))
+
+    async def get(self, entities: Iterable[str]) -> tuple:
+        entities = list(entities)
+        stale = [entity for entity in entities if self._versions.get(entity) is None]
+        if stale:
+            await self._refresh(stale)
+        return tuple(self._versions.get(entity, 0) for entity in entities)
+
+
+entity_versions = EntityVersions()
+_responses = SizedLRUCache(max_bytes=RESPONSE_CACHE_MAX_BYTES)
+
+
+def _bump_statement(entities: list):
+    stmt = pg_insert(EntityVersion).values([
+        {"entity": entity, "version": entity_version_seq.next_value()} for entity in entities
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[EntityVersion.entity],
+        set_={"version": stmt.excluded.version}
+    ).returning(EntityVersion.entity, EntityVersion.version)
+
+
+async def bump_versions(db: AsyncSession, *entities: str):
+    """
+    Entity versiyalarını cari tranzaksiya daxilində artırır.
+    Lokal surət yalnız commit-dən sonra yenilənir, əks halda commit olunmamış
+    köhnə məlumat yeni versiya ilə keşlənə bilər.
+    """
+    entities = sorted(set(entities))
+    if not entities:
+        return
+
+    pending = db.info.setdefault("pending_versions", {})
+    pending.update({row.entity: row.version for row in await db.execute(_bump_statement(entities))})
+
+
+def bump_versions_sync(db: Session, *entities: str):
+    """bump_versions-un sync Session üçün variantı (flush event-ləri və skriptlər)"""
+    entities = sorted(set(entities))
+    if not entities:
+        return
+
+    pending = db.info.setdefault("pending_versions", {})
+    pending.update({row.entity: row.version for row in db.execute(_bump_statement(entities))})
+
+
+# AsyncSession commit-i də daxili sync Session üzərindən keçir
+@event.listens_for(Session, "after_commit")
+def _apply_pending_versions(session):
+    pending = session.info.pop("pending_versions", None)
+    if pending:
+        entity_versions.apply(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_versions(session):
+    session.info.pop("pending_versions", None)
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def to_json(schema, value: Any) -> bytes:
+    """ORM obyektlərini response schema-sı ilə JSON bytes-a çevirir"""
+    adapter = _adapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+async def _replica_is_current(db: AsyncSession, entities: list, versions: tuple) -> bool:
+    result = await db.execute(
+        select(EntityVersion.entity, EntityVersion.version).where(EntityVersion.entity.in_(entities))
+    )
+    replica_versions = {row.entity: row.version for row in result}
+    return all(replica_versions.get(entity, 0) >= version for entity, version in zip(entities, versions))
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+async def cached_response(
+    request: Request,
+    db: AsyncSession,
+    entities: Iterable[str],
+    build: Callable[[AsyncSession], Awaitable[bytes]]
+) -> Response:
+    """
+    build(db) yalnız keşdə olmayanda çağırılır (await) və JSON bytes qaytarmalıdır.
+    Eyni açar və versiyalar həmişə eyni cavabı verdiyi üçün ETag strong-dur.
+    """
+    entities = list(entities)
+    versions = await entity_versions.get(entities)
+    key = (settings.VERSION, request.url.path, request.url.query, tuple(entities), versions)
+    etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    body = _responses.get(key)
+    if body is None:
+        if is_replica_session(db) and not await _replica_is_current(db, entities, versions):
+            # Replica geri qalıb - köhnə məlumat yeni versiya ilə keşlənməsin deyə primary-dən qurulur
+            async with AsyncSessionLocal() as primary:
+                body = await build(primary)
+        else:
+            body = await build(db)
+        _responses.set(key, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
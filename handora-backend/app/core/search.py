@@ -0,0 +1,67 @@
+# ==================== app/core/search.py ====================
+"""
+Məhsul axtarışı - PostgreSQL full-text search
+
+Hər dil üçün Product.search_<lang> tsvector sütunu (GIN indeksli) istifadə olunur.
+Ad 'A', təsvir 'B' çəkisi ilə saxlanılır, nəticələr ts_rank_cd ilə sıralanır.
+"""
+import re
+from typing import Optional
+from sqlalchemy import cast, false, func, literal, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from app.models.product import Product
+
+SEARCH_LANGUAGES = {
+    "az": ("simple", Product.search_az),
+    "en": ("english", Product.search_en),
+    "ru": ("russian", Product.search_ru),
+}
+
+# Yalnız hərf və rəqəmlər - to_tsquery sintaksisini (&, |, !, :) pozan simvollar atılır
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def build_tsquery(config: str, term: str):
+    """Axtarış sözlərindən prefix tsquery qurur: 'əl xal' -> 'əl:* & xal:*'"""
+    tokens = _TOKEN_RE.findall(term.lower())
+    if not tokens:
+        return None
+    return func.to_tsquery(
+        cast(literal(config), REGCONFIG),
+        " & ".join(f"{token}:*" for token in tokens)
+    )
+
+
+def search_clauses(term: str, lang: Optional[str] = None):
+    """
+    (filter, rank) cütü qaytarır.
+    lang verilməyibsə bütün dillərdə axtarılır və ən yüksək rank götürülür.
+    """
+    languages = [lang] if lang else list(SEARCH_LANGUAGES)
+    conditions = []
+    ranks = []
+
+    for code in languages:
+        config, column = SEARCH_LANGUAGES[code]
+        tsquery = build_tsquery(config, term)
+        if tsquery is None:
+            return None, None
+        conditions.append(column.op("@@")(tsquery))
+        ranks.append(func.ts_rank_cd(column, tsquery))
+
+    rank = ranks[0] if len(ranks) == 1 else func.greatest(*ranks)
+    return or_(*conditions), rank
+
+
+def filter_search(stmt, term: str, lang: Optional[str] = None):
+    """Yalnız axtarış filtri - sıralama çağıran tərəfə qalır (məs. cursor pagination)"""
+    condition, _ = search_clauses(term, lang)
+    return stmt.where(condition if condition is not None else false())
+
+
+def apply_search(stmt, term: str, lang: Optional[str] = None):
+    """Statement-ə axtarış filtrini və relevance sıralamasını əlavə edir"""
+    condition, rank = search_clauses(term, lang)
+    if condition is None:
+        return stmt.where(false())
+    return stmt.where(condition).order_by(rank.desc(), Product.id.desc())
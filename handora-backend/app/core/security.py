@@ -3,9 +3,14 @@ from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import NamedTuple
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.database import get_db
+from app.core.cache import TTLCache
+from app.database import get_async_db
+from app.models.user import User, UserRole
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -17,16 +22,10 @@ security = HTTPBearer()
 #     return pwd_context.verify(plain_password, hashed_password)
 
 
-from passlib.context import CryptContext
-
-# 1) Argon2 istifadə edirik
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(password, hashed_password)
+# Argon2 - app/core/passwords.py (API-də *_async variantları istifadə olunur)
+from app.core.passwords import (
+    pwd_context, hash_password, verify_password, hash_password_async, verify_password_async
+)
 
 
 
@@ -47,12 +46,74 @@ def decode_token(token: str):
     except JWTError:
         return None
 
-def get_current_user(
+class UserPrincipal(NamedTuple):
+    """Autentifikasiya üçün lazım olan minimal istifadəçi məlumatı"""
+    id: int
+    role: UserRole
+    is_active: bool
+
+
+# user_id -> UserPrincipal
+# Rol/aktivlik/şifrə ORM ilə dəyişəndə principal commit-dən sonra bu worker-in
+# keşindən silinir; digər worker-lər onu ən çox PRINCIPAL_TTL_SECONDS ərzində görür.
+# Keşdə olan istifadəçi üçün autentifikasiya bazaya müraciət etmir.
+PRINCIPAL_TTL_SECONDS = 30
+_principals = TTLCache(maxsize=10000, ttl=PRINCIPAL_TTL_SECONDS)
+
+# Bu sahələr dəyişəndə keşlənmiş principal etibarsız olur
+_PRINCIPAL_FIELDS = ("role", "is_active", "password_hash")
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_users(session, flush_context, instances):
+    changed = {
+        obj.id for obj in session.dirty
+        if isinstance(obj, User) and any(
+            inspect(obj).attrs[field].history.has_changes() for field in _PRINCIPAL_FIELDS
+        )
+    }
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, User))
+    if changed:
+        session.info.setdefault("changed_principals", set()).update(changed)
+
+
+# AsyncSession commit-i də daxili sync Session üzərindən keçir
+@event.listens_for(Session, "after_commit")
+def _drop_changed_principals(session):
+    for user_id in session.info.pop("changed_principals", ()):
+        _principals.pop(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_principals(session):
+    session.info.pop("changed_principals", None)
+
+
+async def _load_principal(db: AsyncSession, user_id: int):
+    principal = _principals.get(user_id)
+    if principal is not None:
+        return principal
+
+    row = (await db.execute(
+        select(User.id, User.role, User.is_active).where(User.id == user_id)
+    )).first()
+    if row is None:
+        return None
+
+    principal = UserPrincipal(row.id, row.role, row.is_active)
+    _principals.set(user_id, principal)
+    return principal
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    from app.models.user import User
-    
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
+    """
+    Token-dəki istifadəçini qaytarır (UserPrincipal - id, role, is_active).
+    Principal keşləndiyi üçün adi halda bazaya sorğu getmir;
+    tam User obyekti lazımdırsa endpoint özü yükləməlidir.
+    """
     token = credentials.credentials
     payload = decode_token(token)
     
@@ -69,18 +130,22 @@ def get_current_user(
             detail="Token məlumatları düzgün deyil"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _load_principal(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="İstifadəçi tapılmadı"
         )
     
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Hesab deaktiv edilib"
+        )
+    
     return user
 
-def get_current_admin(current_user = Depends(get_current_user)):
-    from app.models.user import UserRole
-    
+async def get_current_admin(current_user: UserPrincipal = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
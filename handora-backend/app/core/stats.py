@@ -0,0 +1,128 @@
+# ==================== app/core/stats.py ====================
+"""
+Admin dashboard statistikaları
+
+Əsas yol stat_counters cədvəlidir (app/models/stats.py): triggerlər hər
+yazmada delta əlavə edir, /admin/stats isə yalnız kiçik cədvəli cəmləyir.
+Sayğaclar heç vaxt hesablanmayıbsa (yeni quraşdırma) və ya ?exact=true ilə
+bütün rəqəmlər bir FILTER aqreqat sorğusu ilə yenidən hesablanır və fərq
+düzəliş delta sətri kimi yazılır (cədvəl kilidlənmir).
+"""
+import asyncio
+import logging
+from sqlalchemy import delete, func, insert, literal_column, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.order import Order, ORDER_STATUSES
+from app.models.product import Product, Category, Brand
+from app.models.stats import StatCounter, LOW_STOCK_THRESHOLD
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Sayğaclar ən azı bir dəfə dəqiq hesablanıb (mövcud bazada triggerlər sonradan qoşulanda vacibdir)
+SEEDED = "_seeded"
+# pg_advisory_xact_lock açarı - eyni anda iki düzəliş yazılmasın
+RECOMPUTE_LOCK_ID = 0x73746174  # "stat"
+
+
+def _counter_names() -> list:
+    return ["products", "products:low_stock", "categories", "brands", "users", "orders"] + [
+        f"orders:{order_status}" for order_status in ORDER_STATUSES
+    ]
+
+
+def _exact_statement():
+    """Bütün sayğaclar bir sorğuda - hər cədvəl bir dəfə oxunur"""
+    products = select(
+        func.count().label("products"),
+        func.count().filter(Product.stock < LOW_STOCK_THRESHOLD).label("products:low_stock")
+    ).select_from(Product).subquery()
+    orders = select(
+        func.count().label("orders"),
+        *[
+            func.count().filter(Order.status == order_status).label(f"orders:{order_status}")
+            for order_status in ORDER_STATUSES
+        ]
+    ).select_from(Order).subquery()
+
+    return select(
+        products,
+        orders,
+        select(func.count()).select_from(Category).scalar_subquery().label("categories"),
+        select(func.count()).select_from(Brand).scalar_subquery().label("brands"),
+        select(func.count()).select_from(User).scalar_subquery().label("users")
+    )
+
+
+async def compute_exact(db: AsyncSession) -> dict:
+    return dict((await db.execute(_exact_statement())).one()._mapping)
+
+
+async def recompute(db: AsyncSession) -> dict:
+    """
+    Dəqiq dəyərləri hesablayıb sayğacları düzəldir - yazmaları bloklamadan.
+
+    Dəqiq saylar və stat_counters-in cəmi bir sorğuda, yəni eyni snapshot-da oxunur.
+    Trigger sətirləri öz yazmaları ilə birlikdə commit olunur, ona görə snapshot-da
+    görünən deltalar məhz snapshot-da görünən dəyişikliklərə uyğundur. Hər sayğac
+    üçün (dəqiq - görünən cəm) düzəliş sətri əlavə edilir; snapshot-dan sonra
+    commit olunan deltalar toxunulmaz qalır və üstünə gəlir.
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(RECOMPUTE_LOCK_ID)))
+    sums = select(StatCounter.name, func.sum(StatCounter.value).label("value"))\
+        .group_by(StatCounter.name)\
+        .subquery()
+    visible = select(type_coerce(
+        func.coalesce(func.jsonb_object_agg(sums.c.name, sums.c.value), literal_column("'{}'::jsonb")), JSONB
+    )).scalar_subquery().label("_visible")
+    row = dict((await db.execute(_exact_statement().add_columns(visible))).one()._mapping)
+    visible = row.pop("_visible")
+
+    corrections = [
+        {"name": name, "value": value - int(visible.get(name) or 0)}
+        for name, value in [*row.items(), (SEEDED, 1)]
+    ]
+    corrections = [correction for correction in corrections if correction["value"]]
+    if corrections:
+        await db.execute(insert(StatCounter), corrections)
+    return row
+
+
+async def read_counters(db: AsyncSession) -> dict:
+    """Sayğacların cari dəyərləri; hələ hesablanmayıbsa dəqiq hesablanır"""
+    rows = dict((await db.execute(
+        select(StatCounter.name, func.sum(StatCounter.value)).group_by(StatCounter.name)
+    )).all())
+    if not rows.get(SEEDED):
+        return await recompute(db)
+    return {name: int(rows.get(name) or 0) for name in _counter_names()}
+
+
+async def compact(db: AsyncSession):
+    """Delta sətirlərini sayğac başına bir sətrə sıxır (oxuma O(sayğac sayı) qalır)"""
+    gone = delete(StatCounter).returning(StatCounter.name, StatCounter.value).cte("gone")
+    await db.execute(
+        insert(StatCounter).from_select(
+            ["name", "value"],
+            select(gone.c.name, func.sum(gone.c.value))
+            .group_by(gone.c.name)
+            .having(func.sum(gone.c.value) != literal_column("0"))
+        )
+    )
+
+
+async def run_stats_compactor():
+    """App işlədikcə hər STATS_COMPACT_SECONDS-da bir sayğacları sıxır"""
+    while True:
+        await asyncio.sleep(settings.STATS_COMPACT_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await compact(db)
+                await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Statistika sayğacları sıxılmadı")
@@ -0,0 +1,217 @@
+# ==================== app/core/storage.py ====================
+"""
+Şəkil anbarı - lokal disk və ya S3-uyğun obyekt anbarı (AWS S3, MinIO, R2 ...)
+
+Fayllar açar (key) ilə saxlanılır, məs. "products/<sha256>.jpg". Bazada URL-lər
+yazılır; URL-i storage.url(key) qurur, storage.key_for(url) geri çevirir.
+STORAGE_BACKEND=local olduqda fayllar LOCAL_STORAGE_DIR-də saxlanılır və
+/uploads altında app-in özü verir. STORAGE_BACKEND=s3 olduqda fayllar bucket-ə
+yazılır, brauzer onları S3_PUBLIC_URL-dən (CDN və ya bucket) birbaşa alır -
+bir neçə backend konteyneri ortaq volume olmadan işləyə bilir.
+
+S3 driver-i aiobotocore tələb edir (pip install aiobotocore).
+"""
+import asyncio
+import contextlib
+import glob
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, Tuple
+import aiofiles
+from app.core.config import settings
+
+CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+# S3 multipart hissəsinin minimumu 5MB-dır (sonuncu hissə istisna)
+MIN_MULTIPART_CHUNK = 5 * 1024 * 1024
+
+
+def content_type(key: str) -> str:
+    return CONTENT_TYPES.get(key.rsplit(".", 1)[-1].lower(), "application/octet-stream")
+
+
+class Storage(ABC):
+    """Driver interfeysi - bütün əməliyyatlar async-dir; çatışmayan metodu olan driver yaradılmır"""
+    base_url: str
+
+    @abstractmethod
+    async def save(self, key: str, path: str):
+        """Lokal faylı (məs. emal nəticəsini) açar altında saxlayır"""
+
+    async def save_many(self, files: Iterable[Tuple[str, str]]):
+        """(key, path) cütlərini paralel saxlayır - şəklin orijinalı və variantları"""
+        await asyncio.gather(*[self.save(key, path) for key, path in files])
+
+    @abstractmethod
+    async def download(self, key: str, path: str):
+        """Faylı lokal yola köçürür (yoxdursa FileNotFoundError)"""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Faylı silir (yoxdursa xəta vermir)"""
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str):
+        """Açarı prefix ilə başlayan bütün faylları silir (şəklin variantları)"""
+
+    async def close(self):
+        pass
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_for(self, url: str) -> Optional[str]:
+        """Bu anbara aid URL-in açarı; kənar URL (məs. başqa saytdakı loqo) üçün None"""
+        if not url or not url.startswith(self.base_url + "/"):
+            return None
+        return url[len(self.base_url) + 1:]
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: str, base_url: str):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Yanlış açar: {key}")
+        return path
+
+    def _save(self, key: str, source: str):
+        destination = self.path(key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        try:
+            os.replace(source, destination)
+        except OSError:
+            # Müvəqqəti qovluq başqa fayl sistemindədir - kopyalanıb atomik əvəzlənir
+            partial = destination + ".part"
+            shutil.copyfile(source, partial)
+            os.replace(partial, destination)
+
+    async def save(self, key: str, path: str):
+        await asyncio.to_thread(self._save, key, path)
+
+    async def download(self, key: str, path: str):
+        await asyncio.to_thread(shutil.copyfile, self.path(key), path)
+
+    async def delete(self, key: str):
+        with contextlib.suppress(FileNotFoundError):
+            await asyncio.to_thread(os.remove, self.path(key))
+
+    async def delete_prefix(self, prefix: str):
+        for path in await asyncio.to_thread(glob.glob, f"{glob.escape(self.path(prefix))}*"):
+            with contextlib.suppress(FileNotFoundError):
+                await asyncio.to_thread(os.remove, path)
+
+
+class S3Storage(Storage):
+    def __init__(self):
+        try:
+            from aiobotocore.session import get_session
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 üçün aiobotocore lazımdır: pip install aiobotocore")
+
+        self.bucket = settings.S3_BUCKET
+        self.base_url = (
+            settings.S3_PUBLIC_URL or f"{settings.S3_ENDPOINT_URL}/{settings.S3_BUCKET}"
+        ).rstrip("/")
+        self._client_args = dict(
+            service_name="s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+            # MinIO və əksər S3-uyğun anbarlar path-style ünvan istəyir
+            config=Config(s3={"addressing_style": "path"}, max_pool_connections=settings.S3_MAX_CONNECTIONS),
+        )
+        self._session = get_session()
+        self._exit_stack = contextlib.AsyncExitStack()
+        self._client = None
+        self._client_lock = asyncio.Lock()
+
+    async def _get_client(self):
+        # Bir client (və onun connection pool-u) bütün sorğular üçün - hər worker prosesində ayrıca
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    self._client = await self._exit_stack.enter_async_context(
+                        self._session.create_client(**self._client_args)
+                    )
+        return self._client
+
+    async def save(self, key: str, path: str):
+        client = await self._get_client()
+        size = os.path.getsize(path)
+        async with aiofiles.open(path, "rb") as source:
+            if size <= settings.S3_MULTIPART_THRESHOLD:
+                await client.put_object(
+                    Bucket=self.bucket, Key=key, Body=await source.read(), ContentType=content_type(key)
+                )
+                return
+
+            upload = await client.create_multipart_upload(
+                Bucket=self.bucket, Key=key, ContentType=content_type(key)
+            )
+            chunk_size = max(settings.S3_MULTIPART_CHUNK_SIZE, MIN_MULTIPART_CHUNK)
+            parts = []
+            try:
+                while chunk := await source.read(chunk_size):
+                    part = await client.upload_part(
+                        Bucket=self.bucket, Key=key, UploadId=upload["UploadId"],
+                        PartNumber=len(parts) + 1, Body=chunk
+                    )
+                    parts.append({"PartNumber": len(parts) + 1, "ETag": part["ETag"]})
+                await client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload["UploadId"],
+                    MultipartUpload={"Parts": parts}
+                )
+            except BaseException:
+                # Yarımçıq hissələr bucket-də yer tutmasın
+                await client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload["UploadId"])
+                raise
+
+    async def download(self, key: str, path: str):
+        client = await self._get_client()
+        try:
+            response = await client.get_object(Bucket=self.bucket, Key=key)
+        except client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+        async with response["Body"] as body, aiofiles.open(path, "wb") as target:
+            async for chunk in body.iter_chunks(settings.S3_MULTIPART_CHUNK_SIZE):
+                await target.write(chunk)
+
+    async def delete(self, key: str):
+        client = await self._get_client()
+        await client.delete_object(Bucket=self.bucket, Key=key)
+
+    async def delete_prefix(self, prefix: str):
+        client = await self._get_client()
+        paginator = client.get_paginator("list_objects_v2")
+        # Hər səhifə ən çox 1000 açardır - delete_objects limiti ilə eyni
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                await client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+    async def close(self):
+        await self._exit_stack.aclose()
+        self._client = None
+
+
+def create_storage() -> Storage:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage()
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_URL)
+    raise RuntimeError(f"Naməlum STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+
+storage = create_storage()
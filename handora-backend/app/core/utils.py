@@ -1,13 +1,33 @@
 # ==================== app/core/utils.py ====================
+import asyncio
+import hashlib
+import logging
 import os
-import uuid
+import shutil
+import tempfile
+from collections import Counter
+from typing import List, Optional, Tuple
 from fastapi import UploadFile, HTTPException
-from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession
 import aiofiles
+from app.core.images import process_image_async
+from app.core.image_cache import discard_resized
+from app.core.image_store import acquire_images, store_manifests, track_new_image
+from app.core.storage import storage
 
-UPLOAD_DIR = "uploads/products"
+logger = logging.getLogger(__name__)
+
+# Məhsul şəkillərinin anbardakı açar prefiksi (app/core/storage.py)
+PRODUCT_IMAGE_PREFIX = "products"
 ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Magic bytes -> saxlanacaq uzantı
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+]
 
 def validate_image(file: UploadFile):
     """Validate uploaded image"""
@@ -23,64 +43,163 @@ def validate_image(file: UploadFile):
     if not file.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="Fayl şəkil formatında olmalıdır")
 
-async def save_product_image(file: UploadFile) -> str:
-    """Save product image and return URL"""
-    validate_image(file)
+def product_image_url(filename: str) -> str:
+    return storage.url(f"{PRODUCT_IMAGE_PREFIX}/{filename}")
+
+def image_manifest(processed: dict) -> dict:
+    """Pool-un qaytardığı fayl adlarını URL-lərə çevirir (products.image_variants formatı)"""
+    return {
+        "url": product_image_url(processed["file"]),
+        "width": processed["width"],
+        "height": processed["height"],
+        "variants": {
+            image_format: [
+                {"url": product_image_url(variant["file"]), "width": variant["width"], "height": variant["height"]}
+                for variant in variants
+            ]
+            for image_format, variants in processed["variants"].items()
+        }
+    }
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Faylın ilk baytlarına görə real formatı (uzantı) qaytarır; dəstəklənmirsə None"""
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    return None
+
+async def _stream_to_temp(file: UploadFile, path: str) -> Tuple[str, str]:
+    """
+    Yüklənməni hissə-hissə müvəqqəti fayla yazır, sniff olunmuş formatı və sha256-nı qaytarır.
+    Yaddaşda eyni anda ən çox UPLOAD_CHUNK_SIZE qədər məlumat olur; limit aşılan kimi dayanır.
+    """
+    size = 0
+    image_type = None
+    digest = hashlib.sha256()
+    async with aiofiles.open(path, 'wb') as out_file:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            if image_type is None:
+                image_type = sniff_image_type(chunk)
+                if image_type is None:
+                    raise HTTPException(status_code=400, detail="Fayl JPG və ya PNG şəkli deyil")
+            
+            size += len(chunk)
+            if size > MAX_FILE_SIZE:
+                raise HTTPException(status_code=400, detail="Şəkil 5MB-dan böyük ola bilməz")
+            
+            digest.update(chunk)
+            await out_file.write(chunk)
     
-    # Create upload directory
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    if image_type is None:
+        raise HTTPException(status_code=400, detail="Fayl boşdur")
+    return image_type, digest.hexdigest()
+
+async def receive_upload(file: UploadFile) -> Tuple[str, str, str]:
+    """Yoxlayıb müvəqqəti fayla yazır: (müvəqqəti fayl, uzantı, sha256). Faylı çağıran silir."""
+    validate_image(file)
     
-    # Generate unique filename
-    ext = file.filename.split('.')[-1].lower()
-    filename = f"{uuid.uuid4()}.{ext}"
-    filepath = os.path.join(UPLOAD_DIR, filename)
+    # Ölçü məlumdursa heç nə oxumadan rədd edilir
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="Şəkil 5MB-dan böyük ola bilməz")
     
-    # Save file
-    async with aiofiles.open(filepath, 'wb') as out_file:
-        content = await file.read()
-        
-        # Check file size
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="Şəkil 5MB-dan böyük ola bilməz")
+    # Müvəqqəti fayl anbarda deyil - static mount ilə görünməsin
+    fd, temp_path = tempfile.mkstemp(suffix=".upload")
+    os.close(fd)
+    try:
+        # Uzantı istifadəçinin fayl adından yox, faylın məzmunundan götürülür
+        ext, digest = await _stream_to_temp(file, temp_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path, ext, digest
+
+async def process_upload(temp_path: str, filename: str) -> dict:
+    """
+    Resize, optimize and build variants (process pool-da, event loop bloklanmır),
+    nəticə faylları anbara paralel yazılır; manifest qaytarır
+    """
+    work_dir = tempfile.mkdtemp(prefix="image-")
+    try:
+        try:
+            processed = await process_image_async(temp_path, work_dir, filename)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Şəkil emal edilmədi: {str(e)}")
         
-        await out_file.write(content)
+        files = [processed["file"]] + [
+            variant["file"] for variants in processed["variants"].values() for variant in variants
+        ]
+        try:
+            await storage.save_many(
+                (f"{PRODUCT_IMAGE_PREFIX}/{name}", os.path.join(work_dir, name)) for name in files
+            )
+        except BaseException:
+            # Yarımçıq yazılmış orijinal və variantlar silinir
+            await delete_product_image(product_image_url(filename))
+            raise
+    finally:
+        await asyncio.to_thread(shutil.rmtree, work_dir, True)
     
-    # Resize and optimize image
+    return image_manifest(processed)
+
+async def save_product_images(db: AsyncSession, files: List[UploadFile]) -> List[dict]:
+    """
+    Məhsulun şəkillərini saxlayır və manifestlərini qaytarır (app/core/image_store.py).
+    Artıq saxlanmış bayt-lar emal olunmur; yenilər paralel emal olunur.
+    Fayllar tranzaksiyaya bağlıdır - çağıran commit/rollback etməlidir.
+    """
+    received = await asyncio.gather(*[receive_upload(file) for file in files], return_exceptions=True)
+    temp_paths = [result[0] for result in received if isinstance(result, tuple)]
     try:
-        img = Image.open(filepath)
+        errors = [result for result in received if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
         
-        # Convert RGBA to RGB if necessary
-        if img.mode == 'RGBA':
-            img = img.convert('RGB')
+        uploads = {digest: (temp_path, ext) for temp_path, ext, digest in received}
+        manifests = await acquire_images(db, Counter(digest for _, _, digest in received))
         
-        # Resize if too large
-        max_size = (1200, 1200)
-        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        new = [digest for digest, manifest in manifests.items() if manifest is None]
+        processed = await asyncio.gather(
+            *[process_upload(uploads[digest][0], f"{digest}.{uploads[digest][1]}") for digest in new],
+            return_exceptions=True
+        )
+        for digest, result in zip(new, processed):
+            if isinstance(result, dict):
+                track_new_image(db, result["url"])
+                manifests[digest] = result
+        errors = [result for result in processed if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
         
-        # Save optimized
-        img.save(filepath, optimize=True, quality=85)
-    except Exception as e:
-        # If optimization fails, delete the file
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        raise HTTPException(status_code=400, detail=f"Şəkil emal edilmədi: {str(e)}")
+        await store_manifests(db, {digest: manifests[digest] for digest in new})
+    finally:
+        for temp_path in temp_paths:
+            os.remove(temp_path)
     
-    # Return URL path
-    return f"/uploads/products/{filename}"
+    return [manifests[digest] for _, _, digest in received]
 
-def delete_file(url: str):
-    """Delete file from filesystem"""
-    if not url:
+async def delete_product_image(url: str):
+    """Məhsul şəklini və onun bütün variantlarını ({stem}_{en}.{format}) silir"""
+    key = storage.key_for(url)
+    if key is None:
         return
     
-    # Remove leading slash and convert to filesystem path
-    if url.startswith('/'):
-        url = url[1:]
-    
-    filepath = url.replace('/', os.sep)
+    try:
+        await storage.delete(key)
+        await storage.delete_prefix(f"{os.path.splitext(key)[0]}_")
+        # /img resize proxy-sinin nüsxələri immutable verilir - orijinalla birlikdə silinməlidir
+        await discard_resized(key)
+    except Exception as e:
+        logger.warning("Şəkil silinmədi %s: %s", key, e)
+
+async def delete_file(url: str):
+    """Delete file from storage (anbara aid olmayan URL-lər nəzərə alınmır)"""
+    key = storage.key_for(url)
+    if key is None:
+        return
     
-    if os.path.exists(filepath):
-        try:
-            os.remove(filepath)
-        except Exception as e:
-            print(f"Could not delete file {filepath}: {e}")
\ No newline at end of file
+    try:
+        await storage.delete(key)
+    except Exception as e:
+        logger.warning("Fayl silinmədi %s: %s", key, e)
@@ -1,15 +1,137 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+# Sync engine - skriptlər (scripts/) və cədvəl yaradılması üçün
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine (asyncpg) - API routerləri üçün
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW
+)
+# expire_on_commit=False - commit-dən sonra atributlara müraciət əlavə (async-də qadağan) sorğu etməsin
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+# Replica-nın primary-dən nə qədər geri qaldığı (WAL tam tətbiq olunubsa 0)
+_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = make_url(url).set(drivername="postgresql+asyncpg")
+        self.engine = create_async_engine(
+            self.url,
+            pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW
+        )
+        self.sessionmaker = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        self.down_until = 0.0
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    """
+    Read replica-lar arasında round-robin.
+    Qoşulmayan və ya REPLICA_MAX_LAG_SECONDS-dan çox geri qalan replica
+    REPLICA_RETRY_SECONDS müddətinə siyahıdan çıxarılır; heç biri yoxdursa primary istifadə olunur.
+    """
+
+    def __init__(self, urls: list):
+        self.replicas = [Replica(url) for url in urls]
+        self._counter = itertools.count()
+
+    def candidates(self) -> list:
+        if not self.replicas:
+            return []
+        now = time.monotonic()
+        start = next(self._counter) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.down_until <= now]
+
+    def mark_down(self, replica: Replica):
+        replica.down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+    async def check(self, replica: Replica, db: AsyncSession) -> bool:
+        """Qoşulmanı və lag-ı yoxlayır; lag ən çox REPLICA_HEALTH_CHECK_SECONDS-da bir dəfə ölçülür"""
+        try:
+            now = time.monotonic()
+            if now - replica.checked_at < settings.REPLICA_HEALTH_CHECK_SECONDS:
+                await db.connection()  # pool_pre_ping qoşulmanı yoxlayır
+                return True
+
+            lag = await db.scalar(_REPLICA_LAG_SQL)
+            replica.checked_at = now
+        except (DBAPIError, OSError):
+            self.mark_down(replica)
+            return False
+
+        if lag is not None and lag > settings.REPLICA_MAX_LAG_SECONDS:
+            self.mark_down(replica)
+            return False
+        return True
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+
+
+def is_replica_session(db: AsyncSession) -> bool:
+    return bool(db.info.get("replica"))
+
+
+@asynccontextmanager
+async def read_session():
+    """Yalnız oxuma üçün session - sağlam replica, yoxdursa primary"""
+    for replica in replica_router.candidates():
+        db = replica.sessionmaker()
+        if not await replica_router.check(replica, db):
+            await db.close()
+            continue
+
+        db.info["replica"] = True
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db():
+    """
+    Read-only endpointlər üçün (katalog, kateqoriya, brend, suggestion, wishlist oxuma).
+    Yazma və öz yazısını dərhal oxuyan axınlar (sifarişlər) get_async_db ilə primary-də qalır.
+    """
+    async with read_session() as db:
+        yield db
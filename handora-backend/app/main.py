@@ -1,19 +1,51 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
-from app.database import engine, Base
-from app.api import auth, products, categories, brands, orders, wishlist, admin, suggestion, user
-from pathlib import Path
+from app.core.middleware import UploadSizeLimitMiddleware
+from app.database import engine, async_engine, replica_router, Base
+from app.core.passwords import password_pool
+from app.core.images import image_pool
+from app.core.storage import storage, LocalStorage
+from app.core.image_files import ImageFiles
+from app.core.inventory import run_reconciler
+from app.core.stats import run_stats_compactor
+from app.core.analytics import run_sales_rollup
+from app.api import auth, products, categories, brands, orders, wishlist, admin, suggestion, user, reservations, analytics, images
+import asyncio
+import contextlib
 import os
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
-# Create uploads directory
-os.makedirs("uploads/products", exist_ok=True)
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Fon işləri app ilə başlayır və dayanır. Dayananda əvvəl task-lar ləğv edilib
+    bitməsi gözlənilir, sonra onların istifadə etdiyi pool-lar, anbar və baza bağlantıları bağlanır.
+    """
+    workers = [
+        asyncio.create_task(run_reconciler()),
+        asyncio.create_task(run_stats_compactor()),
+        asyncio.create_task(run_sales_rollup()),
+    ]
+    try:
+        yield
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        password_pool.shutdown()
+        image_pool.shutdown()
+        await storage.close()
+        for replica in replica_router.replicas:
+            await replica.engine.dispose()
+        await async_engine.dispose()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_PREFIX}/openapi.json"
@@ -28,11 +60,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Böyük multipart sorğular form parse edilməzdən əvvəl rədd edilir
+app.add_middleware(UploadSizeLimitMiddleware, max_size=settings.MAX_UPLOAD_REQUEST_SIZE)
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-app.mount("/uploads", StaticFiles(directory=BASE_DIR / "uploads"), name="uploads")
-
+# Lokal anbarda şəkilləri app özü verir; S3 istifadə olunduqda brauzer onları birbaşa anbardan alır
+if isinstance(storage, LocalStorage):
+    os.makedirs(os.path.join(storage.root, "products"), exist_ok=True)
+    app.mount(storage.base_url, ImageFiles(directory=storage.root), name="uploads")
 
 
 # Include routers
@@ -45,6 +79,10 @@ app.include_router(wishlist.router, prefix=settings.API_PREFIX)
 app.include_router(admin.router, prefix=settings.API_PREFIX)
 app.include_router(suggestion.router, prefix=settings.API_PREFIX)
 app.include_router(user.router, prefix=settings.API_PREFIX)
+app.include_router(reservations.router, prefix=settings.API_PREFIX)
+app.include_router(analytics.router, prefix=settings.API_PREFIX)
+# /uploads kimi API prefiksi olmadan - şəkil URL-ləri
+app.include_router(images.router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,73 @@
+from sqlalchemy import Column, String, Integer, BigInteger, SmallInteger, Float, Date, DateTime, Identity, DDL, event
+from app.database import Base
+
+# Rollup ölçüləri: "total" (key=0), "product", "brand", "category" (key - uyğun id)
+SALES_DIMENSIONS = ["total", "product", "brand", "category"]
+
+class SalesRollupColumns:
+    dimension = Column(String(20), primary_key=True)
+    key = Column(Integer, primary_key=True)
+    revenue = Column(Float, nullable=False, default=0)
+    units = Column(BigInteger, nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)
+
+class SalesHourly(SalesRollupColumns, Base):
+    """Saatlıq satış - sifarişin yaradılma saatı üzrə (ləğv olunanlar çıxılır)"""
+    __tablename__ = "sales_hourly"
+
+    bucket = Column(DateTime, primary_key=True)
+
+class SalesDaily(SalesRollupColumns, Base):
+    """Günlük satış - uzun müddətli qrafiklər bunu oxuyur"""
+    __tablename__ = "sales_daily"
+
+    bucket = Column(Date, primary_key=True)
+
+class SalesRollupQueue(Base):
+    """
+    Rollup-a hələ düşməmiş sifariş dəyişiklikləri (sign=1 satış, -1 ləğv).
+    Trigger yalnız sətir əlavə edir, fon prosesi onları rollup-lara köçürür -
+    checkout-lar eyni rollup sətrini kilidləmək üçün növbəyə durmur.
+    """
+    __tablename__ = "sales_rollup_queue"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    order_id = Column(Integer, nullable=False)
+    sign = Column(SmallInteger, nullable=False)
+
+
+_DDL = """
+SELECT pg_advisory_xact_lock(hashtext('sales_rollup_ddl'));
+
+CREATE OR REPLACE FUNCTION sales_enqueue_orders() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO sales_rollup_queue (order_id, sign)
+        SELECT id, 1 FROM new_rows WHERE status IS DISTINCT FROM 'cancelled';
+    ELSE
+        -- Ləğv edilən sifariş çıxılır, ləğvdən qaytarılan yenidən əlavə olunur
+        INSERT INTO sales_rollup_queue (order_id, sign)
+        SELECT new_rows.id, CASE WHEN new_rows.status = 'cancelled' THEN -1 ELSE 1 END
+        FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+        WHERE coalesce(old_rows.status = 'cancelled', false) <> coalesce(new_rows.status = 'cancelled', false);
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+-- Trigger artıq varsa toxunulmur: DROP/CREATE orders-i ACCESS EXCLUSIVE kilidləyir və
+-- arada işləyən worker-lərin sifarişləri növbəyə düşməzdi (funksiya yuxarıda yenilənir)
+DO $trigger$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'sales_orders_insert' AND tgrelid = 'orders'::regclass) THEN
+        CREATE TRIGGER sales_orders_insert AFTER INSERT ON orders
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION sales_enqueue_orders();
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'sales_orders_update' AND tgrelid = 'orders'::regclass) THEN
+        CREATE TRIGGER sales_orders_update AFTER UPDATE ON orders
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION sales_enqueue_orders();
+    END IF;
+END $trigger$;
+"""
+
+event.listen(Base.metadata, "after_create", DDL(_DDL).execute_if(dialect="postgresql"))
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, BigInteger, Sequence
+from app.database import Base
+
+# Bütün versiyalar üçün ümumi artan ardıcıllıq - versiya hər dəyişiklikdə yalnız artır.
+# Worker-lər versiyaları entity (PK) ilə oxuyur, version üzrə axtarış yoxdur
+entity_version_seq = Sequence("entity_version_seq", metadata=Base.metadata)
+
+class EntityVersion(Base):
+    __tablename__ = "entity_versions"
+    
+    entity = Column(String(100), primary_key=True)
+    version = Column(BigInteger, nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, func
+from app.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    # scope - "{user_id}:{endpoint}", eyni key müxtəlif istifadəçi/endpoint üçün toqquşmasın
+    scope = Column(String(150), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sorğu gövdəsinin sha256-sı
+    # Sətir sorğu tranzaksiyası daxilində cavabsız yaradılır və cavabla birlikdə commit olunur,
+    # buna görə commit olunmuş sətirdə bu sahələr həmişə doludur
+    status_code = Column(Integer)
+    response_body = Column(LargeBinary)
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.database import Base
+
+class ImageBlob(Base):
+    """
+    Məzmun hash-i ilə saxlanan şəkil (fayl adı sha256.{uzantı}) və ona istinad sayı.
+    Eyni bayt-lar yenidən yükləndikdə emal edilmir, refcount artır; 0 olduqda fayllar silinir.
+    """
+    __tablename__ = "image_blobs"
+    
+    digest = Column(String(64), primary_key=True)
+    manifest = Column(JSONB, nullable=True)  # products.image_variants elementi ilə eyni format
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
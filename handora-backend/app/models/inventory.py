@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, CheckConstraint, func
+from app.database import Base
+
+class InventoryShard(Base):
+    """Çox sifariş alan məhsulun stoku N sətrə bölünür ki, checkout-lar bir sətir kilidini gözləməsin"""
+    __tablename__ = "inventory_shards"
+    __table_args__ = (
+        CheckConstraint("available >= 0", name="ck_inventory_shards_available"),
+    )
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    available = Column(Integer, nullable=False, default=0)
+
+class InventoryReservation(Base):
+    """Səbət/checkout zamanı müvəqqəti ayrılmış stok - vaxtı bitəndə geri qaytarılır"""
+    __tablename__ = "inventory_reservations"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    shard = Column(Integer, nullable=True)  # NULL - stok products.stock-dan götürülüb
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
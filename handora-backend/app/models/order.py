@@ -1,10 +1,37 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
+# Sifariş statusları (admin status dəyişiklikləri bunlarla yoxlanılır)
+ORDER_STATUSES = ["pending", "confirmed", "shipped", "delivered", "cancelled"]
+
+# İcazə verilən status keçidləri; eyni statusa "keçid" (məs. yalnız tracking yeniləmək) həmişə olar
+ORDER_TRANSITIONS = {
+    "pending": {"confirmed", "cancelled"},
+    "confirmed": {"shipped", "cancelled"},
+    "shipped": {"delivered"},
+    "delivered": set(),
+    "cancelled": set(),
+}
+
+
+def can_transition(current: str, new: str) -> bool:
+    return current == new or new in ORDER_TRANSITIONS.get(current, set())
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        # İstifadəçinin sifariş tarixçəsi (GET /orders) - yeni sifarişlər əvvəl
+        Index("ix_orders_user_created_at_id", "user_id", text("created_at DESC"), text("id DESC")),
+        # Admin konsolu - status filtri + tarix sırası, tracking nömrəsi ilə axtarış
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        Index(
+            "ix_orders_tracking_number", "tracking_number",
+            postgresql_where=text("tracking_number IS NOT NULL")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -23,7 +50,7 @@ class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, ARRAY, Computed, Index
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.database import Base
 
@@ -17,8 +18,23 @@ class Category(Base):
     products = relationship("Product", back_populates="category")
     parent = relationship("Category", remote_side=[id])
 
+class CategoryClosure(Base):
+    """Kateqoriya ağacının closure cədvəli - hər (əcdad, nəsil) cütü üçün bir sətir, özü də daxil (depth=0)"""
+    __tablename__ = "category_closure"
+    __table_args__ = (
+        Index("ix_category_closure_descendant_ancestor", "descendant_id", "ancestor_id"),
+    )
+    
+    ancestor_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
 class Brand(Base):
     __tablename__ = "brands"
+    __table_args__ = (
+        # Admin brend siyahısı - keyset pagination (yeni brendlər əvvəl)
+        Index("ix_brands_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), unique=True, nullable=False)
@@ -28,8 +44,25 @@ class Brand(Base):
     
     products = relationship("Product", back_populates="brand")
 
+def _search_document(config: str, lang: str) -> str:
+    """Ad 'A', təsvir 'B' çəkisi ilə tsvector ifadəsi (generated column üçün)"""
+    return (
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce(name_{lang}, '')), 'A') || "
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce(description_{lang}, '')), 'B')"
+    )
+
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_search_az", "search_az", postgresql_using="gin"),
+        Index("ix_products_search_en", "search_en", postgresql_using="gin"),
+        Index("ix_products_search_ru", "search_ru", postgresql_using="gin"),
+        # Keyset pagination - hər sıralama üçün (açar, id)
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_brand_created_at_id", "brand_id", "created_at", "id"),
+        Index("ix_products_category_created_at_id", "category_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name_az = Column(String(500), nullable=False)
@@ -43,12 +76,22 @@ class Product(Base):
     category_id = Column(Integer, ForeignKey("categories.id"))
     brand_id = Column(Integer, ForeignKey("brands.id"))
     image_urls = Column(ARRAY(String), nullable=True)
+    # Hər şəkil üçün manifest: {url, width, height, variants: {webp: [{url, width, height}], avif: [...]}}
+    image_variants = Column(JSONB, nullable=True)
     stock = Column(Integer, default=0)
+    # > 0 olduqda stok inventory_shards-dadır (app/core/inventory.py), stock isə onların cəmidir
+    stock_shards = Column(Integer, nullable=False, default=0, server_default="0")
     is_new = Column(Boolean, default=True)
     is_sale = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Full-text search - PostgreSQL hər yazılışda özü yeniləyir (STORED generated column).
+    # Azərbaycan dili üçün hazır konfiqurasiya olmadığından "simple" istifadə olunur.
+    search_az = deferred(Column(TSVECTOR, Computed(_search_document("simple", "az"), persisted=True)))
+    search_en = deferred(Column(TSVECTOR, Computed(_search_document("english", "en"), persisted=True)))
+    search_ru = deferred(Column(TSVECTOR, Computed(_search_document("russian", "ru"), persisted=True)))
+    
     category = relationship("Category", back_populates="products")
     brand = relationship("Brand", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
@@ -0,0 +1,125 @@
+from sqlalchemy import Column, String, BigInteger, Identity, DDL, event
+from app.database import Base
+
+# "Az stok" həddi - dashboard-dakı low_stock sayğacı bununla hesablanır
+LOW_STOCK_THRESHOLD = 5
+
+class StatCounter(Base):
+    """
+    Dashboard sayğacları - yalnız əlavə olunan delta sətirləri.
+    Triggerlər hər yazma əməliyyatında (name, +/-N) əlavə edir; sətirlər bir-birini
+    kilidləmir. Sayğacın dəyəri name üzrə cəmdir, fon prosesi sətirləri cəmlərə sıxır.
+    """
+    __tablename__ = "stat_counters"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    name = Column(String(100), nullable=False, index=True)
+    value = Column(BigInteger, nullable=False)
+
+
+# Statement-level triggerlər (transition cədvəlləri ilə): bulk UPDATE də bir neçə
+# delta sətri yaradır, dəyişməyən sayğaclara isə heç nə yazılmır.
+_FUNCTIONS = f"""
+-- Bir neçə worker eyni anda başlayanda CREATE OR REPLACE bir-biri ilə toqquşmasın
+SELECT pg_advisory_xact_lock(hashtext('stat_counters_ddl'));
+
+CREATE OR REPLACE FUNCTION stats_count_rows() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stat_counters (name, value)
+        SELECT TG_ARGV[0], count(*) FROM new_rows HAVING count(*) > 0;
+    ELSE
+        INSERT INTO stat_counters (name, value)
+        SELECT TG_ARGV[0], -count(*) FROM old_rows HAVING count(*) > 0;
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_orders() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stat_counters (name, value)
+        SELECT 'orders', count(*) FROM new_rows HAVING count(*) > 0
+        UNION ALL
+        SELECT 'orders:' || status, count(*) FROM new_rows WHERE status IS NOT NULL GROUP BY status;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stat_counters (name, value)
+        SELECT 'orders', -count(*) FROM old_rows HAVING count(*) > 0
+        UNION ALL
+        SELECT 'orders:' || status, -count(*) FROM old_rows WHERE status IS NOT NULL GROUP BY status;
+    ELSE
+        INSERT INTO stat_counters (name, value)
+        SELECT 'orders:' || status, sum(delta) FROM (
+            SELECT status, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT status, -1 FROM old_rows
+        ) AS changes
+        WHERE status IS NOT NULL
+        GROUP BY status
+        HAVING sum(delta) <> 0;
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_products() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stat_counters (name, value)
+        SELECT 'products', count(*) FROM new_rows HAVING count(*) > 0
+        UNION ALL
+        SELECT 'products:low_stock', count(*) FROM new_rows
+        WHERE stock < {LOW_STOCK_THRESHOLD} HAVING count(*) > 0;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stat_counters (name, value)
+        SELECT 'products', -count(*) FROM old_rows HAVING count(*) > 0
+        UNION ALL
+        SELECT 'products:low_stock', -count(*) FROM old_rows
+        WHERE stock < {LOW_STOCK_THRESHOLD} HAVING count(*) > 0;
+    ELSE
+        INSERT INTO stat_counters (name, value)
+        SELECT 'products:low_stock', sum(delta) FROM (
+            SELECT 1 AS delta FROM new_rows WHERE stock < {LOW_STOCK_THRESHOLD}
+            UNION ALL
+            SELECT -1 FROM old_rows WHERE stock < {LOW_STOCK_THRESHOLD}
+        ) AS changes
+        HAVING sum(delta) <> 0;
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+"""
+
+
+def _triggers(table: str, function: str, with_update: bool) -> str:
+    statements = []
+    events = [("insert", "INSERT", "NEW TABLE AS new_rows"), ("delete", "DELETE", "OLD TABLE AS old_rows")]
+    if with_update:
+        events.append(("update", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"))
+    for suffix, operation, referencing in events:
+        name = f"stats_{table}_{suffix}"
+        # Trigger artıq varsa toxunulmur - DROP/CREATE cədvəli ACCESS EXCLUSIVE kilidləyir
+        # və arada işləyən worker-lərin yazmaları sayılmazdı (funksiyalar yuxarıda yenilənir)
+        statements.append(f"""
+DO $trigger$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = '{name}' AND tgrelid = '{table}'::regclass) THEN
+        CREATE TRIGGER {name} AFTER {operation} ON {table}
+            REFERENCING {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION {function};
+    END IF;
+END $trigger$;""")
+    return "".join(statements)
+
+
+_TRIGGERS = "".join([
+    _triggers("orders", "stats_orders()", with_update=True),
+    _triggers("products", "stats_products()", with_update=True),
+    _triggers("categories", "stats_count_rows('categories')", with_update=False),
+    _triggers("brands", "stats_count_rows('brands')", with_update=False),
+    _triggers("users", "stats_count_rows('users')", with_update=False),
+])
+
+# create_all hər işə düşəndə funksiyalar yenilənir, olmayan triggerlər yaradılır (mövcud bazalar da daxil)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(_FUNCTIONS + _TRIGGERS).execute_if(dialect="postgresql")
+)
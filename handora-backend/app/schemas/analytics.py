@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Union
+from datetime import date, datetime
+
+class SalesPoint(BaseModel):
+    bucket: Union[datetime, date]
+    revenue: float
+    units: int
+    orders: int
+
+class SalesSeries(BaseModel):
+    dimension: str
+    key: int
+    granularity: str
+    date_from: date
+    date_to: date
+    points: List[SalesPoint]
+
+class TopSeller(BaseModel):
+    key: int
+    revenue: float
+    units: int
+    orders: int
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+class ReservationCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+class ReservationResponse(BaseModel):
+    id: int
+    product_id: int
+    quantity: int
+    created_at: datetime
+    expires_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ProductShardsResponse(BaseModel):
+    product_id: int
+    stock: int
+    stock_shards: int
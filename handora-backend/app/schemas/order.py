@@ -1,13 +1,14 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 class OrderItemCreate(BaseModel):
     product_id: int
-    quantity: int
+    quantity: int = Field(..., gt=0)
+    reservation_id: Optional[int] = Field(None, description="POST /reservations ilə ayrılmış stok")
 
 class OrderCreate(BaseModel):
-    items: List[OrderItemCreate]
+    items: List[OrderItemCreate] = Field(..., min_length=1)
     shipping_address: str
 
 class OrderItemResponse(BaseModel):
@@ -29,4 +30,38 @@ class OrderResponse(BaseModel):
     items: List[OrderItemResponse]
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AdminOrderUser(BaseModel):
+    id: int
+    email: str
+    full_name: str
+    
+    class Config:
+        from_attributes = True
+
+class AdminOrderResponse(OrderResponse):
+    """Admin sifariş siyahısı - müştəri və tracking məlumatı ilə"""
+    user: AdminOrderUser
+    tracking_number: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class OrderStatusUpdate(BaseModel):
+    order_id: int
+    status: str
+    tracking_number: Optional[str] = Field(None, max_length=100)
+
+class BulkOrderStatusUpdate(BaseModel):
+    updates: List[OrderStatusUpdate] = Field(..., min_length=1, max_length=1000)
+
+class OrderStatusResult(BaseModel):
+    order_id: int
+    success: bool
+    previous_status: Optional[str] = None
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkOrderStatusResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[OrderStatusResult]
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Cursor ilə səhifələnmiş cavab"""
+    items: List[T]
+    next_cursor: Optional[str] = Field(None, description="Növbəti səhifə üçün cursor (son səhifədə null)")
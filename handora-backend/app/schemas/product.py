@@ -110,8 +110,8 @@
 #     created_at: datetime
 #     updated_at: datetime
 
-from pydantic import BaseModel, field_validator, Field
-from typing import Optional, List
+from pydantic import BaseModel, field_validator, model_validator, Field
+from typing import Optional, List, Dict
 from datetime import datetime
 
 
@@ -253,14 +253,61 @@ class ProductUpdate(BaseModel):
     is_sale: Optional[bool] = None
 
 
+class ImageSource(BaseModel):
+    type: str = Field(..., description="MIME tipi, məs. image/webp")
+    srcset: str = Field(..., description="<source srcset> dəyəri, məs. '/a_200.webp 200w, /a_400.webp 400w'")
+
+
+class ProductImage(BaseModel):
+    """<picture> üçün: sources ən yığcam formatdan başlayır, src orijinaldır (fallback)"""
+    src: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    sources: List[ImageSource] = Field(default_factory=list)
+
+
+# Brauzer ilk uyğun <source>-u seçir - daha yığcam format əvvəl
+IMAGE_SOURCE_TYPES = [("avif", "image/avif"), ("webp", "image/webp")]
+
+
 class ProductResponse(ProductBase):
     id: int
     is_new: bool
     is_sale: bool
     stock: int
     image_urls: Optional[List[str]] = None
+    images: List[ProductImage] = Field(default_factory=list, validation_alias="image_variants")
     brand: Optional[BrandResponse] = None
     
+    @field_validator('images', mode='before')
+    @classmethod
+    def build_sources(cls, v):
+        """products.image_variants manifestini srcset strukturuna çevirir"""
+        images = []
+        for manifest in v or []:
+            sources = [
+                {
+                    "type": mime_type,
+                    "srcset": ", ".join(f"{variant['url']} {variant['width']}w" for variant in manifest["variants"][image_format])
+                }
+                for image_format, mime_type in IMAGE_SOURCE_TYPES
+                if manifest.get("variants", {}).get(image_format)
+            ]
+            images.append({
+                "src": manifest["url"],
+                "width": manifest.get("width"),
+                "height": manifest.get("height"),
+                "sources": sources
+            })
+        return images
+    
+    @model_validator(mode='after')
+    def fallback_images(self):
+        """Variantları olmayan (köhnə) məhsullarda yalnız orijinal şəkillər"""
+        if not self.images and self.image_urls:
+            self.images = [ProductImage(src=url) for url in self.image_urls]
+        return self
+    
     class Config:
         from_attributes = True
 
@@ -283,4 +330,26 @@ class ProductFilter(BaseModel):
     is_sale: Optional[bool] = Field(None, description="Endirimli məhsullar")
     min_price: Optional[float] = Field(None, ge=0, description="Minimum qiymət")
     max_price: Optional[float] = Field(None, ge=0, description="Maksimum qiymət")
-    search: Optional[str] = Field(None, description="Məhsul adında axtarış")
\ No newline at end of file
+    search: Optional[str] = Field(None, description="Məhsul adında axtarış")
+
+
+# ==================== FACET SCHEMAS ====================
+class FacetCount(BaseModel):
+    id: int
+    count: int
+
+
+class PriceBucketFacet(BaseModel):
+    min: float
+    max: Optional[float] = Field(None, description="Son aralıq üçün null (yuxarıdan açıq)")
+    count: int
+
+
+class ProductFacets(BaseModel):
+    """Cari filtrə uyğun məhsul sayları"""
+    total: int
+    brands: List[FacetCount]
+    categories: List[FacetCount]
+    price_buckets: List[PriceBucketFacet]
+    is_new: Dict[str, int]
+    is_sale: Dict[str, int]
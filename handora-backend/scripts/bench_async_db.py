@@ -0,0 +1,97 @@
+"""
+Sync (threadpool) və async (asyncpg) DB yolunun concurrency müqayisəsi
+Hər iki tərəf eyni pool ölçüsü ilə eyni sorğunu icra edir; sorğu pg_sleep ilə
+yavaşladılır ki, I/O gözləməsi üstünlük təşkil etsin (real endpoint kimi).
+
+Sync tərəf FastAPI-nin sync endpointləri kimi anyio threadpool-da işləyir
+(default 40 thread) - pool nə qədər böyük olsa da eyni anda ən çox 40 sorğu
+gedir. Async tərəf bir event loop-da bütün pool-u istifadə edir.
+
+İstifadə: python scripts/bench_async_db.py [--requests 2000] [--concurrency 200] [--sleep 0.02]
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from anyio import to_thread
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+
+
+def _report(name: str, total: int, elapsed: float, latencies: list):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<8} {total / elapsed:>9.1f} req/s   p50 {p50:>7.1f} ms   p99 {p99:>7.1f} ms")
+
+
+async def _run(worker, total: int, concurrency: int) -> tuple:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await worker()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    return time.perf_counter() - started, latencies
+
+
+async def bench_sync(args, query):
+    engine = create_engine(settings.DATABASE_URL, pool_size=args.pool_size, max_overflow=0)
+    to_thread.current_default_thread_limiter().total_tokens = args.threads
+
+    def work():
+        with engine.connect() as conn:
+            conn.execute(query, {"s": args.sleep})
+
+    async def worker():
+        await to_thread.run_sync(work)
+
+    try:
+        elapsed, latencies = await _run(worker, args.requests, args.concurrency)
+        _report("sync", args.requests, elapsed, latencies)
+    finally:
+        engine.dispose()
+
+
+async def bench_async(args, query):
+    engine = create_async_engine(settings.ASYNC_DATABASE_URL, pool_size=args.pool_size, max_overflow=0)
+
+    async def worker():
+        async with engine.connect() as conn:
+            await conn.execute(query, {"s": args.sleep})
+
+    try:
+        elapsed, latencies = await _run(worker, args.requests, args.concurrency)
+        _report("async", args.requests, elapsed, latencies)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async DB benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=40, help="Threadpool limiti (anyio default-u 40)")
+    parser.add_argument("--sleep", type=float, default=0.02, help="Hər sorğuda pg_sleep (saniyə)")
+    args = parser.parse_args()
+
+    query = text("SELECT pg_sleep(:s)")
+    print(
+        f"{args.requests} sorğu, concurrency {args.concurrency}, pool {args.pool_size}, "
+        f"threads {args.threads}, sleep {args.sleep}s"
+    )
+    asyncio.run(bench_sync(args, query))
+    asyncio.run(bench_async(args, query))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Şəkil verilməsinin müqayisəsi: köhnə StaticFiles mount-u və ImageFiles (app/core/image_files.py)
+(httpx lazımdır: pip install httpx)
+
+Müvəqqəti qovluqda --files ədəd hash-li şəkil faylı yaradılır, ayrıca uvicorn prosesi
+eyni qovluğu /static (StaticFiles) və /uploads (ImageFiles) altında verir. Hər mount
+üçün tam GET və brauzer/CDN-in yenidən yoxlaması (If-None-Match -> 304) ölçülür.
+Immutable başlığı ilə real trafikdə ikinci növ sorğular ümumiyyətlə gəlmir.
+
+İstifadə:
+  python scripts/bench_image_serving.py [--duration 10] [--clients 32] [--files 50] [--size 150000]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+PORT = 8765
+
+
+def create_app():
+    """uvicorn --factory üçün - yalnız iki mount-lu kiçik app"""
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from starlette.applications import Starlette
+    from starlette.staticfiles import StaticFiles
+    from app.core.image_files import ImageFiles
+
+    directory = os.environ["BENCH_IMAGE_DIR"]
+    app = Starlette()
+    app.mount("/static", StaticFiles(directory=directory))
+    app.mount("/uploads", ImageFiles(directory=directory))
+    return app
+
+
+def _percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def _make_files(directory: str, count: int, size: int) -> list:
+    names = []
+    for _ in range(count):
+        content = os.urandom(size)
+        name = f"{hashlib.sha256(content).hexdigest()}_400.webp"
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(content)
+        names.append(name)
+    return names
+
+
+async def _client(client: httpx.AsyncClient, urls: list, etags: dict, revalidate: bool,
+                  deadline: float, latencies: list, statuses: dict):
+    i = 0
+    while time.monotonic() < deadline:
+        url = urls[i % len(urls)]
+        i += 1
+        headers = {"If-None-Match": etags[url]} if revalidate else {}
+        started = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def run_phase(args, mount: str, names: list, revalidate: bool):
+    urls = [f"/{mount}/{name}" for name in names]
+    limits = httpx.Limits(max_connections=args.clients)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=30) as client:
+        first = await client.get(urls[0])
+        etags = {url: (await client.head(url)).headers["etag"] for url in urls}
+        latencies, statuses = [], {}
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(*[
+            _client(client, urls, etags, revalidate, deadline, latencies, statuses) for _ in range(args.clients)
+        ])
+
+    title = f"{mount} {'If-None-Match' if revalidate else 'GET'}"
+    print(
+        f"{title:<24} {len(latencies) / args.duration:8.1f} req/s  "
+        f"p50 {_percentile(latencies, 0.50):6.1f} ms  p99 {_percentile(latencies, 0.99):6.1f} ms  "
+        f"{statuses}  cache-control: {first.headers.get('cache-control', '-')}"
+    )
+
+
+async def main_async(args, names: list):
+    for revalidate in (False, True):
+        for mount in ("static", "uploads"):
+            await run_phase(args, mount, names, revalidate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StaticFiles və ImageFiles müqayisəsi")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=32, help="Paralel client sayı")
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--size", type=int, default=150_000, help="Fayl ölçüsü (bayt)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        names = _make_files(directory, args.files, args.size)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "--factory", "bench_image_serving:create_app",
+             "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+             "--port", str(PORT), "--log-level", "warning"],
+            env={**os.environ, "BENCH_IMAGE_DIR": directory}
+        )
+        try:
+            for _ in range(50):
+                try:
+                    httpx.get(f"http://127.0.0.1:{PORT}/static/{names[0]}")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.2)
+            print(f"{args.files} fayl x {args.size / 1024:.0f}KB, {args.clients} client, {args.duration}s\n")
+            asyncio.run(main_async(args, names))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Admin şəkil yükləmələri zamanı storefront gecikməsinin ölçülməsi
+İşləyən API-yə qarşı icra olunur (httpx və Pillow lazımdır: pip install httpx).
+
+Əvvəlcə yalnız katalog (GET /products) ölçülür, sonra eyni katalog yükü paralel
+məhsul yaradılması (hər biri --images ədəd böyük JPEG ilə) ilə təkrarlanır.
+Şəkil emalı event loop-dan kənarda olduqda iki mərhələnin p99-u yaxın olmalıdır.
+Yaradılan məhsullar sonda silinir. IMAGE_WORKERS / IMAGE_MAX_PENDING dəyərlərini
+dəyişib nəticələri müqayisə etmək olar.
+
+İstifadə:
+  python scripts/bench_image_upload.py --email admin@example.com --password secret \\
+      --category-id 1 --brand-id 1 [--base-url http://localhost:8000/api] \\
+      [--duration 10] [--uploaders 2] [--images 4] [--readers 16]
+"""
+import argparse
+import asyncio
+import io
+import os
+import time
+import httpx
+from PIL import Image
+
+
+def _percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def _make_photo(width: int = 2400, height: int = 1800) -> bytes:
+    """Təxminən 2-4MB-lıq JPEG (küy yaxşı sıxılmır - real fotoya yaxın decode/encode işi)"""
+    img = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+async def _catalog_reader(client: httpx.AsyncClient, deadline: float, latencies: list):
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/products", params={"limit": 20})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def _uploader(client: httpx.AsyncClient, args, photo: bytes, deadline: float, created: list, counts: dict):
+    form = {
+        "name_az": "Bench", "name_en": "Bench", "name_ru": "Bench",
+        "description_az": "-", "description_en": "-", "description_ru": "-",
+        "price": "10", "category_id": str(args.category_id), "brand_id": str(args.brand_id)
+    }
+    files = [("images", (f"bench-{i}.jpg", photo, "image/jpeg")) for i in range(args.images)]
+    while time.monotonic() < deadline:
+        response = await client.post("/admin/products", data=form, files=files)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        if response.status_code in (200, 201):
+            created.append(response.json()["id"])
+
+
+async def run_phase(args, token: str, photo: bytes, with_uploads: bool):
+    latencies, created, counts = [], [], {}
+    limits = httpx.Limits(max_connections=args.readers + args.uploaders)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, headers=headers, timeout=120) as client:
+        deadline = time.monotonic() + args.duration
+        tasks = [_catalog_reader(client, deadline, latencies) for _ in range(args.readers)]
+        if with_uploads:
+            tasks += [_uploader(client, args, photo, deadline, created, counts) for _ in range(args.uploaders)]
+        await asyncio.gather(*tasks)
+
+        for product_id in created:
+            await client.delete(f"/admin/products/{product_id}")
+
+    title = "şəkil yükləmələri ilə" if with_uploads else "yalnız katalog"
+    print(f"\n== {title} ({args.duration}s) ==")
+    print(
+        f"katalog: {len(latencies) / args.duration:.1f} req/s, "
+        f"p50 {_percentile(latencies, 0.50):.1f} ms, p99 {_percentile(latencies, 0.99):.1f} ms"
+    )
+    if with_uploads:
+        images = len(created) * args.images
+        print(f"yükləmə: {len(created)} məhsul, {images / args.duration:.1f} şəkil/s, status sayları {counts}")
+
+
+async def main_async(args):
+    photo = _make_photo()
+    print(f"Test şəkli: {len(photo) / 1024 / 1024:.1f}MB, məhsul başına {args.images} ədəd")
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        response = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+    await run_phase(args, token, photo, with_uploads=False)
+    await run_phase(args, token, photo, with_uploads=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Şəkil yükləmə zamanı katalog p99 benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000/api")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--category-id", type=int, required=True)
+    parser.add_argument("--brand-id", type=int, required=True)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--uploaders", type=int, default=2, help="Paralel admin yükləmə client sayı")
+    parser.add_argument("--images", type=int, default=4, help="Məhsul başına şəkil sayı")
+    parser.add_argument("--readers", type=int, default=16, help="Paralel katalog client sayı")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Login burst altında login/s və katalog gecikməsinin ölçülməsi
+İşləyən API-yə qarşı icra olunur (httpx lazımdır: pip install httpx).
+
+Əvvəlcə yalnız katalog (GET /products) ölçülür, sonra eyni katalog yükü
+paralel login burst ilə təkrarlanır. PASSWORD_WORKERS / PASSWORD_MAX_PENDING
+dəyərlərini dəyişib nəticələri müqayisə etmək olar.
+
+İstifadə:
+  python scripts/bench_login.py --email user@example.com --password secret \\
+      [--base-url http://localhost:8000/api] [--duration 10] [--logins 64] [--readers 16]
+"""
+import argparse
+import asyncio
+import time
+import httpx
+
+
+def _percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+async def _catalog_reader(client: httpx.AsyncClient, deadline: float, latencies: list):
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/products", params={"limit": 20})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def _login_storm(client: httpx.AsyncClient, args, deadline: float, counts: dict):
+    body = {"email": args.email, "password": args.password}
+    while time.monotonic() < deadline:
+        response = await client.post("/auth/login", json=body)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+
+async def run_phase(args, with_logins: bool):
+    latencies, counts = [], {}
+    limits = httpx.Limits(max_connections=args.readers + args.logins)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        deadline = time.monotonic() + args.duration
+        tasks = [_catalog_reader(client, deadline, latencies) for _ in range(args.readers)]
+        if with_logins:
+            tasks += [_login_storm(client, args, deadline, counts) for _ in range(args.logins)]
+        await asyncio.gather(*tasks)
+
+    title = "login burst ilə" if with_logins else "yalnız katalog"
+    print(f"\n== {title} ({args.duration}s) ==")
+    print(
+        f"katalog: {len(latencies) / args.duration:.1f} req/s, "
+        f"p50 {_percentile(latencies, 0.50):.1f} ms, p99 {_percentile(latencies, 0.99):.1f} ms"
+    )
+    if with_logins:
+        print(f"login:   {counts.get(200, 0) / args.duration:.1f} uğurlu/s, status sayları {counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput və katalog p99 benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000/api")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--logins", type=int, default=64, help="Paralel login client sayı")
+    parser.add_argument("--readers", type=int, default=16, help="Paralel katalog client sayı")
+    args = parser.parse_args()
+
+    asyncio.run(run_phase(args, with_logins=False))
+    asyncio.run(run_phase(args, with_logins=True))
+
+
+if __name__ == "__main__":
+    main()
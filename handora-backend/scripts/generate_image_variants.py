@@ -0,0 +1,65 @@
+"""
+Mövcud məhsul şəkilləri üçün responsive variantların (WebP/AVIF) yaradılması
+(image_variants sütunu əlavə edildikdən sonra bir dəfə işə salın; manifesti
+olmayan məhsullar emal olunur, orijinal fayllar dəyişmir)
+
+Yalnız lokal anbar (STORAGE_BACKEND=local) üçündür - variantlardan əvvəlki şəkillər diskdədir.
+Əvvəlcə: ALTER TABLE products ADD COLUMN IF NOT EXISTS image_variants JSONB;
+İstifadə: python scripts/generate_image_variants.py [--workers 4]
+"""
+import argparse
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import select
+from app.models.order import Order, OrderItem, WishlistItem
+from app.models.product import Product
+from app.models.user import User
+from app.database import SessionLocal
+from app.core.config import settings
+from app.core.images import add_variants, variant_formats
+from app.core.response_cache import bump_versions_sync
+from app.core.storage import storage, LocalStorage
+from app.core.utils import PRODUCT_IMAGE_PREFIX, image_manifest
+
+
+def _variants(url: str, formats: list) -> dict:
+    directory, filename = os.path.split(storage.path(storage.key_for(url)))
+    return image_manifest(add_variants(directory, filename, settings.IMAGE_VARIANT_WIDTHS, formats))
+
+
+def generate(workers: int):
+    db = SessionLocal()
+    formats = variant_formats()
+    done, failed = 0, 0
+    try:
+        products = db.scalars(
+            select(Product).where(Product.image_variants.is_(None), Product.image_urls.isnot(None))
+        ).all()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for product in products:
+                urls = [
+                    url for url in product.image_urls
+                    if (storage.key_for(url) or "").startswith(PRODUCT_IMAGE_PREFIX + "/")
+                ]
+                try:
+                    product.image_variants = list(pool.map(_variants, urls, [formats] * len(urls)))
+                except Exception as e:
+                    print(f"❌ Məhsul {product.id}: {e}")
+                    failed += 1
+                    continue
+                bump_versions_sync(db, "products", f"product:{product.id}")
+                db.commit()
+                done += 1
+        print(f"✅ {done} məhsul üçün variantlar yaradıldı, {failed} xəta ({', '.join(formats)})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mövcud şəkillər üçün responsive variantlar")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    if not isinstance(storage, LocalStorage):
+        sys.exit("❌ Skript yalnız STORAGE_BACKEND=local ilə işləyir")
+    generate(parser.parse_args().workers)
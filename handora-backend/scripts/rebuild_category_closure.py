@@ -0,0 +1,30 @@
+"""
+Kateqoriya closure cədvəlini parent_id-lərdən yenidən qurmaq üçün skript
+(mövcud bazaya category_closure əlavə edildikdə bir dəfə işə salın)
+İstifadə: python scripts/rebuild_category_closure.py
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.models.order import Order, OrderItem, WishlistItem
+from app.models.product import Category, CategoryClosure
+from app.models.user import User
+from app.database import SessionLocal, engine, Base
+from app.core.category_tree import rebuild_category_closure
+
+def rebuild():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    
+    try:
+        rebuild_category_closure(db)
+        db.commit()
+        print(f"✅ Closure cədvəli yeniləndi: {db.query(CategoryClosure).count()} sətir")
+    except Exception as e:
+        print(f"❌ Xəta: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,52 @@
+"""
+Satış rollup-larını (sales_hourly, sales_daily) sifarişlərdən yenidən qurmaq üçün skript
+(mövcud bazaya analitika əlavə edildikdə bir dəfə və ya məhsulların brend/kateqoriyası
+kütləvi dəyişdikdən sonra işə salın). App işləyərkən də təhlükəsizdir - rollup worker-i
+eyni advisory lock-u gözləyir.
+İstifadə: python scripts/rebuild_sales_rollups.py
+"""
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import delete, func, insert, literal, select, text
+from app.models.analytics import SalesHourly, SalesDaily, SalesRollupQueue
+from app.models.order import Order
+from app.models.user import User
+from app.database import AsyncSessionLocal, async_engine, engine, Base
+from app.core.analytics import fold_queue, ROLLUP_LOCK_ID, ROLLUP_BATCH_SIZE
+
+
+async def rebuild():
+    async with AsyncSessionLocal() as db:
+        # Rollup worker dayanır, yeni sifarişlər isə növbəyə yazılmağı gözləyir
+        await db.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_ID)))
+        await db.execute(text("LOCK TABLE sales_rollup_queue IN EXCLUSIVE MODE"))
+        await db.execute(delete(SalesRollupQueue))
+        await db.execute(delete(SalesHourly))
+        await db.execute(delete(SalesDaily))
+        await db.execute(
+            insert(SalesRollupQueue).from_select(
+                ["order_id", "sign"],
+                select(Order.id, literal(1)).where(Order.status.is_distinct_from("cancelled"))
+            )
+        )
+
+        orders = 0
+        while True:
+            processed = await fold_queue(db, ROLLUP_BATCH_SIZE * 10)
+            orders += processed
+            if not processed:
+                break
+        await db.commit()
+    await async_engine.dispose()
+    return orders
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    try:
+        orders = asyncio.run(rebuild())
+        print(f"✅ Satış rollup-ları yeniləndi: {orders} sifariş")
+    except Exception as e:
+        print(f"❌ Xəta: {e}")
@@ -0,0 +1,144 @@
+"""
+create_order üçün concurrency stress testi - overselling olmadığını yoxlayır
+Müvəqqəti istifadəçi və iki məhsul yaradır, create_order-i çoxlu paralel
+tranzaksiyada birbaşa çağırır (yarısı [A, B], yarısı [B, A] sırası ilə),
+sonda stokun mənfiyə düşmədiyini və satılan miqdarın stokla üst-üstə düşdüyünü
+yoxlayır. Yaradılan məlumatlar silinir.
+
+--shards N ilə məhsullar sharded sayğaclara bölünür (app/core/inventory.py) -
+sifariş/s nəticəsini shard-sız variantla müqayisə etmək olar.
+
+İstifadə: python scripts/stress_orders.py [--stock 50] [--buyers 300] [--shards 0]
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+import uuid
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+from app.models.order import Order, OrderItem, WishlistItem
+from app.models.product import Category, Brand, Product
+from app.models.user import User
+from app.database import SessionLocal, AsyncSessionLocal, async_engine
+from app.schemas.order import OrderCreate
+from app.core.security import UserPrincipal
+from app.api.orders import create_order
+from app.core.inventory import reconcile, set_product_shards
+
+
+def setup(stock: int):
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"stress-{uuid.uuid4().hex[:12]}@example.com",
+            password_hash="-",
+            full_name="Stress Test",
+            is_active=True
+        )
+        products = [
+            Product(
+                name_az=f"Stress {name}", name_en=f"Stress {name}", name_ru=f"Stress {name}",
+                price=10, stock=stock
+            )
+            for name in ("A", "B")
+        ]
+        db.add_all([user, *products])
+        db.commit()
+        return user.id, [product.id for product in products]
+    finally:
+        db.close()
+
+
+def cleanup(user_id: int, product_ids: list):
+    db = SessionLocal()
+    try:
+        order_ids = select(Order.id).where(Order.user_id == user_id)
+        db.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        db.execute(delete(Order).where(Order.user_id == user_id))
+        db.execute(delete(Product).where(Product.id.in_(product_ids)))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def buy(principal: UserPrincipal, product_ids: list, results: dict):
+    order = OrderCreate(
+        items=[{"product_id": product_id, "quantity": 1} for product_id in product_ids],
+        shipping_address="Bakı"
+    )
+    async with AsyncSessionLocal() as db:
+        try:
+            await create_order(order, idempotency_key=None, current_user=principal, db=db)
+            results["ok"] += 1
+        except HTTPException as e:
+            results[e.status_code] = results.get(e.status_code, 0) + 1
+
+
+async def run(args, user_id: int, product_ids: list):
+    principal = UserPrincipal(user_id, None, True)
+    results = {"ok": 0}
+    reversed_ids = list(reversed(product_ids))
+
+    if args.shards:
+        async with AsyncSessionLocal() as db:
+            for product_id in product_ids:
+                await set_product_shards(db, product_id, args.shards)
+            await db.commit()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        buy(principal, product_ids if i % 2 else reversed_ids, results)
+        for i in range(args.buyers)
+    ])
+    elapsed = time.perf_counter() - started
+    print(f"{args.buyers} cəhd {elapsed:.2f}s-də ({args.buyers / elapsed:.1f} sifariş cəhdi/s)")
+
+    async with AsyncSessionLocal() as db:
+        # Sharded məhsullarda products.stock reconciler ilə yenilənir
+        await reconcile(db)
+        await db.commit()
+        stocks = dict((await db.execute(
+            select(Product.id, Product.stock).where(Product.id.in_(product_ids))
+        )).all())
+        sold = dict((await db.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .join(Order).where(Order.user_id == user_id)
+            .group_by(OrderItem.product_id)
+        )).all())
+    await async_engine.dispose()
+    return results, stocks, sold
+
+
+def main():
+    parser = argparse.ArgumentParser(description="create_order overselling stress testi")
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--buyers", type=int, default=300)
+    parser.add_argument("--shards", type=int, default=0)
+    args = parser.parse_args()
+
+    user_id, product_ids = setup(args.stock)
+    try:
+        results, stocks, sold = asyncio.run(run(args, user_id, product_ids))
+    finally:
+        cleanup(user_id, product_ids)
+
+    print(f"Nəticələr: {results}")
+    failed = False
+    for product_id in product_ids:
+        remaining, sold_count = stocks[product_id], sold.get(product_id, 0)
+        print(f"Məhsul {product_id}: qalan stok {remaining}, satılan {sold_count}")
+        if remaining < 0 or remaining + sold_count != args.stock:
+            failed = True
+    if results["ok"] != min(args.stock, args.buyers):
+        failed = True
+
+    print("❌ Overselling və ya itirilmiş sifariş var" if failed else "✅ Overselling yoxdur")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()